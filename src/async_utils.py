@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import time
+from collections import namedtuple
+
+from bs4 import BeautifulSoup
+from tqdm import tqdm
+
+from constants import KEEPALIVE_TIMEOUT, REQUEST_TIMEOUT
+from exceptions import ParserConnectionFailedException
+from metrics import metrics
+from soup_cache import soup_cache
+from utils import connection_error, get_strainer
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+CLIENT_ERRORS = (OSError, asyncio.TimeoutError)
+if aiohttp is not None:
+    CLIENT_ERRORS += (aiohttp.ClientError,)
+
+# Код и заголовки ответа aiohttp в том виде, в котором их принимает
+# RetryPolicy
+ResponseStatus = namedtuple('ResponseStatus', ('status_code', 'headers'))
+
+
+def create_client(concurrency, timeout=REQUEST_TIMEOUT):
+    """Создаёт клиент aiohttp с пулом соединений, переиспользуемых
+    в пределах одного хоста."""
+    if aiohttp is None:
+        raise ImportError('Для асинхронного движка установите пакет aiohttp')
+    connector = aiohttp.TCPConnector(limit=concurrency,
+                                     limit_per_host=concurrency,
+                                     keepalive_timeout=KEEPALIVE_TIMEOUT)
+    return aiohttp.ClientSession(
+        connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)
+    )
+
+
+class ParserClient:
+    """Клиент aiohttp с параметрами повторов (retry_policy) и ограничителем
+    частоты запросов к хостам (rate_limiter) сессии парсера."""
+    def __init__(self, client, retry_policy=None, rate_limiter=None):
+        self.client = client
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+
+    async def __aenter__(self):
+        self.client = await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, *args):
+        return await self.client.__aexit__(*args)
+
+    def get(self, url):
+        return self.client.get(url)
+
+
+async def fetch_text(client, url):
+    """Возвращает код и заголовки ответа и его текст или (None, None) при
+    сбое соединения."""
+    try:
+        async with client.get(url) as response:
+            text = await response.text(encoding='utf-8')
+            return ResponseStatus(response.status, response.headers), text
+    except CLIENT_ERRORS:
+        return None, None
+
+
+async def get_response_text(client, url):
+    """Загружает текст страницы так же, как utils.get_response: перед
+    каждым запросом ожидается маркер ведра хоста (client.rate_limiter), при
+    сбое соединения или временной ошибке сервера запрос повторяется по
+    параметрам client.retry_policy."""
+    retry_policy = getattr(client, 'retry_policy', None)
+    rate_limiter = getattr(client, 'rate_limiter', None)
+    attempt = 0
+    while True:
+        if rate_limiter is not None:
+            await asyncio.sleep(rate_limiter.get_bucket(url).reserve())
+        started = time.perf_counter()
+        response, text = await fetch_text(client, url)
+        if not (retry_policy and retry_policy.should_retry(attempt,
+                                                           response)):
+            break
+        delay = retry_policy.get_delay(attempt, response)
+        if rate_limiter is not None and response is not None:
+            # Сервер просит снизить частоту запросов всех задач к хосту
+            rate_limiter.pause(url, delay)
+        metrics.increment('retries')
+        await asyncio.sleep(delay)
+        attempt += 1
+
+    if response is None:
+        raise ParserConnectionFailedException(
+            connection_error.format(link=url)
+        )
+    metrics.add_time('network', url, time.perf_counter() - started)
+    metrics.increment('bytes_transferred', len(text.encode('utf-8')))
+    return text
+
+
+async def get_soup_async(client, url, parse_only=None):
+    text = await get_response_text(client, url)
+
+    def parse(text):
+        with metrics.timer('parse', url):
+            return BeautifulSoup(text, features='lxml',
+                                 parse_only=get_strainer(parse_only))
+
+    if not soup_cache.enabled:
+        return parse(text)
+    fingerprint = hashlib.sha1(text.encode('utf-8')).hexdigest()
+    return soup_cache.get_or_parse(url, fingerprint, parse_only, text, parse)
+
+
+async def gather_with_limit(func, items, concurrency, client_factory):
+    semaphore = asyncio.Semaphore(concurrency)
+    progress = tqdm(total=len(items))
+
+    async def call(client, item):
+        async with semaphore:
+            result = await func(client, item)
+        progress.update()
+        return result
+
+    async with client_factory(concurrency) as client:
+        try:
+            return await asyncio.gather(
+                *(call(client, item) for item in items)
+            )
+        finally:
+            progress.close()
+
+
+def map_async(func, items, concurrency=1, client_factory=None,
+              session=None):
+    """Вызывает сопрограмму func(client, item) для каждого элемента не более
+    чем в concurrency задачах одновременно и возвращает результаты в
+    исходном порядке элементов. Повторы запросов и ограничение частоты
+    запросов к хостам берутся из сессии парсера session."""
+    client_factory = client_factory or create_client
+
+    def create_parser_client(concurrency):
+        return ParserClient(client_factory(concurrency),
+                            getattr(session, 'retry_policy', None),
+                            getattr(session, 'rate_limiter', None))
+
+    return asyncio.run(gather_with_limit(
+        func, items, concurrency, create_parser_client
+    ))
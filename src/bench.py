@@ -0,0 +1,189 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import requests
+
+import main
+import outputs
+from configs import positive_int
+from constants import (BENCH_CORPUS_FILE, BENCH_REGRESSION_THRESHOLD,
+                       PARQUET, PRETTY)
+from metrics import metrics
+from snapshots import SnapshotAdapter, SnapshotReader, record
+from soup_cache import soup_cache
+
+BENCH_MODES = ('whats-new', 'latest-versions', 'pep')
+
+
+def create_replay_session(corpus_path):
+    """Создаёт сессию без кеша, отдающую страницы из снимка."""
+    session = requests.Session()
+    adapter = SnapshotAdapter(SnapshotReader(corpus_path))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session, adapter
+
+
+def run_mode(mode, corpus_path):
+    """Выполняет режим по снимку с пустыми кешем разобранных страниц и
+    метриками. Возвращает результаты режима и транспорт снимка."""
+    soup_cache.configure(soup_cache.max_size)
+    metrics.reset()
+    session, adapter = create_replay_session(corpus_path)
+    try:
+        return main.MODE_TO_FUNCTION[mode](session), adapter
+    finally:
+        adapter.reader.close()
+
+
+def measure_peak_rss(mode, corpus_path):
+    """Выполняет режим и возвращает пиковое потребление памяти процессом
+    в МБ, включая память библиотек на C (lxml)."""
+    run_mode(mode, corpus_path)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def get_peak_rss(mode, corpus_path):
+    """Возвращает пиковое потребление памяти режимом в МБ. Пик процесса
+    не уменьшается, поэтому режим выполняется в новом процессе (spawn), а
+    не в процессе замера, где выполнялись другие режимы."""
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context('spawn')
+    ) as pool:
+        return pool.submit(measure_peak_rss, mode, corpus_path).result()
+
+
+def bench_mode(mode, corpus_path, repeat=1):
+    """Возвращает метрики лучшего из repeat запусков режима."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results, adapter = run_mode(mode, corpus_path)
+        wall_time = time.perf_counter() - started
+        if best is None or wall_time < best['wall_time']:
+            # Время разбора - этапы построения дерева и поиска тегов
+            stage_totals = metrics.stage_totals()
+            best = {
+                'wall_time': wall_time,
+                'pages': adapter.pages,
+                'pages_per_sec': adapter.pages / wall_time,
+                'io_time': adapter.io_time,
+                'parse_time': stage_totals['parse'] + stage_totals['select'],
+            }
+    best['output_time'] = bench_outputs(mode, results)
+    best['peak_rss_mb'] = get_peak_rss(mode, corpus_path)
+    return best
+
+
+def bench_outputs(mode, results):
+    """Возвращает суммарное время вывода результатов всеми способами."""
+    started = time.perf_counter()
+    base_dir = outputs.BASE_DIR
+    with tempfile.TemporaryDirectory() as temp_dir:
+        outputs.BASE_DIR = Path(temp_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                for output in outputs.OUTPUT_MODE:
+                    if output == PARQUET and outputs.import_pyarrow() is None:
+                        continue
+                    outputs.control_output(
+                        results, Namespace(mode=mode, output=output)
+                    )
+        finally:
+            outputs.BASE_DIR = base_dir
+    return time.perf_counter() - started
+
+
+def run(corpus_path, modes=BENCH_MODES, repeat=1):
+    return {mode: bench_mode(mode, corpus_path, repeat) for mode in modes}
+
+
+def compare(report, baseline, threshold=BENCH_REGRESSION_THRESHOLD):
+    """Возвращает список режимов, время работы которых выросло по сравнению
+    с эталоном больше чем на threshold."""
+    return [
+        mode for mode, mode_metrics in report.items()
+        if mode in baseline
+        and mode_metrics['wall_time'] > baseline[mode]['wall_time'] * (
+            1 + threshold)
+    ]
+
+
+def print_report(report, baseline=None):
+    rows = [('Режим', 'Время, с', 'Страниц', 'Страниц/с', 'Ввод-вывод, с',
+             'Разбор, с', 'Вывод, с', 'Пик RSS, МБ', 'К эталону')]
+    for mode, mode_metrics in report.items():
+        ratio = ''
+        if baseline and mode in baseline:
+            ratio = '{:.2f}'.format(
+                mode_metrics['wall_time'] / baseline[mode]['wall_time']
+            )
+        rows.append((
+            mode,
+            f"{mode_metrics['wall_time']:.3f}",
+            mode_metrics['pages'],
+            f"{mode_metrics['pages_per_sec']:.1f}",
+            f"{mode_metrics['io_time']:.3f}",
+            f"{mode_metrics['parse_time']:.3f}",
+            f"{mode_metrics['output_time']:.3f}",
+            f"{mode_metrics['peak_rss_mb']:.1f}",
+            ratio,
+        ))
+    outputs.control_output(rows, Namespace(mode='bench', output=PRETTY))
+
+
+def configure_bench_parser():
+    parser = argparse.ArgumentParser(
+        description='Замер производительности парсера'
+    )
+    parser.add_argument('command', choices=('record', 'run'),
+                        help='Запись корпуса страниц или замер')
+    parser.add_argument('--corpus', default=BENCH_CORPUS_FILE,
+                        help='Снимок записанных страниц (zip)')
+    parser.add_argument('--modes', nargs='+', choices=BENCH_MODES,
+                        default=BENCH_MODES, help='Замеряемые режимы')
+    parser.add_argument('--repeat', type=positive_int, default=3,
+                        help='Количество запусков каждого режима')
+    parser.add_argument('--baseline', help='Файл эталона для сравнения')
+    parser.add_argument('--save-baseline',
+                        help='Сохранить результаты замера как эталон')
+    return parser
+
+
+def bench():
+    args = configure_bench_parser().parse_args()
+    if args.command == 'record':
+        pages = record(args.corpus, args.modes)
+        print(f'Записано страниц: {pages}')
+        return 0
+
+    report = run(args.corpus, args.modes, args.repeat)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='UTF-8') as file:
+            baseline = json.load(file)
+    print_report(report, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='UTF-8') as file:
+            json.dump(report, file, indent=2)
+
+    regressions = compare(report, baseline) if baseline else []
+    if regressions:
+        print(f'Замедление относительно эталона: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(bench())
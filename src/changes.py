@@ -0,0 +1,110 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+from constants import CHANGES_INDEX_FILE
+
+ADDED = 'Добавлено'
+REMOVED = 'Удалено'
+CHANGED = 'Изменено'
+CHANGES_HEADER = ('Изменение', 'Ключ', 'Было', 'Стало')
+
+
+def get_digest(value):
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+class ChangeIndex:
+    """Записи прошлого запуска по стабильному ключу (номер PEP, ссылка на
+    статью) для поиска изменений.
+
+    Для сравнения читаются только ключи и хеши записей; прежние значения
+    читаются, а записи обновляются только для изменившихся ключей.
+    """
+    def __init__(self, path=None):
+        path = path or CHANGES_INDEX_FILE
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path),
+                                           check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS records ('
+            'kind TEXT, key TEXT, digest TEXT, value TEXT, '
+            'PRIMARY KEY (kind, key))'
+        )
+
+    def update(self, kind, records, unknown_keys=()):
+        """Сохраняет записи {ключ: значение} текущего запуска и возвращает
+        изменения (изменение, ключ, было, стало): добавленные и изменённые
+        записи в порядке records, затем удалённые.
+
+        Ключи из unknown_keys (например, страницы, которые не удалось
+        загрузить) не считаются удалёнными, их прежние записи сохраняются.
+        При unknown_keys=None удалённые записи не определяются.
+        """
+        current = {}
+        for key, value in records.items():
+            value = json.dumps(value, ensure_ascii=False)
+            current[key] = (get_digest(value), value)
+
+        with self._lock, self._connection:
+            previous = dict(self._connection.execute(
+                'SELECT key, digest FROM records WHERE kind = ?', (kind,)
+            ))
+            changed = [key for key, (digest, _) in current.items()
+                       if previous.get(key, digest) != digest]
+            removed = [] if unknown_keys is None else [
+                key for key in previous
+                if key not in current and key not in unknown_keys
+            ]
+            old_values = self._get_values(kind, changed + removed)
+
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?)',
+                [(kind, key, *current[key]) for key in current
+                 if key not in previous or key in old_values]
+            )
+            self._connection.executemany(
+                'DELETE FROM records WHERE kind = ? AND key = ?',
+                [(kind, key) for key in removed]
+            )
+
+        changes = []
+        for key, (_, value) in current.items():
+            if key not in previous:
+                changes.append((ADDED, key, None, json.loads(value)))
+            elif key in old_values:
+                changes.append((CHANGED, key, old_values[key],
+                                json.loads(value)))
+        for key in removed:
+            changes.append((REMOVED, key, old_values[key], None))
+        return changes
+
+    def _get_values(self, kind, keys):
+        values = {}
+        for key in keys:
+            row = self._connection.execute(
+                'SELECT value FROM records WHERE kind = ? AND key = ?',
+                (kind, key)
+            ).fetchone()
+            values[key] = json.loads(row[0])
+        return values
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM records')
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def iter_change_rows(changes):
+    """Отдаёт строки результата для изменений: заголовок и по строке на
+    изменение, поля записи объединяются через '; '."""
+    yield CHANGES_HEADER
+    for change, key, old, new in changes:
+        yield (change, key,
+               '; '.join(map(str, old)) if old is not None else '',
+               '; '.join(map(str, new)) if new is not None else '')
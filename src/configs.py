@@ -1,10 +1,60 @@
 import argparse
 import logging
-from logging.handlers import RotatingFileHandler
 from sys import stdout
 
-from constants import (FILE, LOG_DIR, LOG_FILE, LOGGER_DT_FORMAT,
-                       LOGGER_FORMAT, PRETTY)
+from constants import (ASYNC_ENGINE, DEFAULT_BACKOFF, DEFAULT_DOCS_TTL,
+                       DEFAULT_MAX_DEPTH, DEFAULT_PARSE_WORKERS,
+                       DEFAULT_PEP_INDEX_TTL,
+                       DEFAULT_PEP_TTL, DEFAULT_RATE_BURST,
+                       DEFAULT_RATE_LIMIT, DEFAULT_RETRIES,
+                       DEFAULT_SOUP_CACHE_SIZE, DEFAULT_WORKERS, FILE, JSONL,
+                       LOG_DIR, LOG_FILE, LOGGER_DT_FORMAT, LOGGER_FORMAT,
+                       PARQUET, PRETTY, SQLITE, SYNC_ENGINE)
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f'Ожидалось положительное целое число, получено: {value}'
+        )
+    return number
+
+
+def non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(
+            f'Ожидалось неотрицательное целое число, получено: {value}'
+        )
+    return number
+
+
+def non_negative_float(value):
+    number = float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(
+            f'Ожидалось неотрицательное число, получено: {value}'
+        )
+    return number
+
+
+def cache_ttl(value):
+    seconds = int(value)
+    if seconds < 1 and seconds != -1:
+        raise argparse.ArgumentTypeError(
+            f'Время жизни кеша должно быть положительным или -1: {value}'
+        )
+    return seconds
+
+
+def megabytes(value):
+    size = float(value)
+    if size < 0:
+        raise argparse.ArgumentTypeError(
+            f'Объём памяти не может быть отрицательным: {value}'
+        )
+    return int(size * 2**20)
 
 
 def configure_argument_parser(available_modes):
@@ -12,6 +62,7 @@ def configure_argument_parser(available_modes):
 
     parser.add_argument(
         'mode',
+        nargs='+',
         choices=available_modes,
         help='Режимы работы парсера',
     )
@@ -26,14 +77,202 @@ def configure_argument_parser(available_modes):
     parser.add_argument(
         '-o',
         '--output',
-        choices=(PRETTY, FILE),
+        choices=(PRETTY, FILE, JSONL, SQLITE, PARQUET),
         help='Дополнительные способы вывода данных',
     )
 
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=positive_int,
+        default=DEFAULT_WORKERS,
+        help='Количество параллельных загрузок страниц',
+    )
+
+    parser.add_argument(
+        '--parse-workers',
+        type=non_negative_int,
+        default=DEFAULT_PARSE_WORKERS,
+        help='Количество процессов для разбора страниц '
+             '(0 - разбор в потоках загрузки)',
+    )
+
+    parser.add_argument(
+        '-e',
+        '--engine',
+        choices=(SYNC_ENGINE, ASYNC_ENGINE),
+        default=SYNC_ENGINE,
+        help='Движок загрузки страниц',
+    )
+
+    parser.add_argument(
+        '--max-depth',
+        type=positive_int,
+        default=DEFAULT_MAX_DEPTH,
+        help='Глубина обхода по ссылкам для целей парсинга с переходом '
+             'по ссылкам (1 - только ссылки стартовой страницы)',
+    )
+
+    parser.add_argument(
+        '--frontier-state',
+        metavar='DIR',
+        help='Папка для состояния очередей обхода режимов: состояние '
+             'сохраняется при прерывании обхода, при следующем запуске '
+             'обход продолжается с него',
+    )
+
+    parser.add_argument(
+        '--bloom-capacity',
+        type=non_negative_int,
+        default=0,
+        help='Ожидаемое число страниц обхода: просмотренные URL хранятся '
+             'в фильтре Блума фиксированного размера (0 - точный учёт)',
+    )
+
+    parser.add_argument(
+        '-b',
+        '--bulk',
+        action='store_true',
+        help='Получение статусов PEP одним запросом к JSON API',
+    )
+
+    parser.add_argument(
+        '--from-snapshot',
+        metavar='PATH',
+        help='Запуск без сети по снимку страниц, сохранённому '
+             'командой snapshots.py',
+    )
+
+    parser.add_argument(
+        '--retries',
+        type=non_negative_int,
+        default=DEFAULT_RETRIES,
+        help='Количество повторов запроса при сбое соединения или '
+             'временной ошибке сервера',
+    )
+
+    parser.add_argument(
+        '--backoff',
+        type=non_negative_float,
+        default=DEFAULT_BACKOFF,
+        help='Начальная задержка перед повтором запроса, с',
+    )
+
+    parser.add_argument(
+        '--rate-limit',
+        type=non_negative_float,
+        default=DEFAULT_RATE_LIMIT,
+        help='Не более указанного числа запросов в секунду к одному хосту '
+             '(0 - без ограничения)',
+    )
+
+    parser.add_argument(
+        '--rate-burst',
+        type=positive_int,
+        default=DEFAULT_RATE_BURST,
+        help='Допустимое число запросов к хосту подряд без ожидания',
+    )
+
+    parser.add_argument(
+        '--pep-index-ttl',
+        type=cache_ttl,
+        default=DEFAULT_PEP_INDEX_TTL,
+        help='Время жизни кеша списка PEP, с (-1 - без ограничения)',
+    )
+
+    parser.add_argument(
+        '--pep-ttl',
+        type=cache_ttl,
+        default=DEFAULT_PEP_TTL,
+        help='Время жизни кеша страниц PEP, с (-1 - без ограничения)',
+    )
+
+    parser.add_argument(
+        '--docs-ttl',
+        type=cache_ttl,
+        default=DEFAULT_DOCS_TTL,
+        help='Время жизни кеша страниц документации, с '
+             '(-1 - без ограничения)',
+    )
+
+    parser.add_argument(
+        '--no-result-cache',
+        action='store_true',
+        help='Отключение кеша извлечённых со страниц данных',
+    )
+
+    parser.add_argument(
+        '--soup-cache-size',
+        type=megabytes,
+        default=DEFAULT_SOUP_CACHE_SIZE,
+        help='Объём памяти под разобранные страницы, МБ (0 - без кеша)',
+    )
+
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Загрузка страниц только новых и изменившихся в списке PEP',
+    )
+
+    parser.add_argument(
+        '--journal',
+        metavar='PATH',
+        help='Файл журнала статусов режима pep для продолжения запуска '
+             'после прерывания',
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Продолжение прерванного запуска режима pep: статусы PEP, '
+             'полученные до прерывания, берутся из журнала (--journal, '
+             'по умолчанию src/pep_journal.jsonl)',
+    )
+
+    parser.add_argument(
+        '-d',
+        '--changes',
+        action='store_true',
+        help='Вывод только изменений относительно прошлого запуска '
+             '(кроме режима download)',
+    )
+
+    parser.add_argument(
+        '--connections',
+        type=positive_int,
+        default=1,
+        help='Количество соединений для загрузки архива по частям',
+    )
+
+    parser.add_argument(
+        '--sha256',
+        help='Ожидаемая контрольная сумма SHA-256 архива',
+    )
+
+    parser.add_argument(
+        '-m',
+        '--metrics',
+        action='store_true',
+        help='Вывод в лог сводки по времени этапов и счётчикам запуска',
+    )
+
+    parser.add_argument(
+        '--metrics-file',
+        help='Файл для сохранения метрик (*.prom - формат Prometheus, '
+             'иначе JSON)',
+    )
+
     return parser
 
 
 def configure_logging(logger):
+    """Подключает к логгеру вывод в консоль и в файл. Повторный вызов для
+    того же логгера ничего не меняет."""
+    from logging.handlers import RotatingFileHandler
+
+    if logger.handlers:
+        return
     LOG_DIR.mkdir(exist_ok=True)
 
     logger.setLevel(logging.DEBUG)
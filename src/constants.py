@@ -7,9 +7,61 @@ MAIN_DOC_URL = 'https://docs.python.org/3/'
 WHATS_NEW_URL = urljoin(MAIN_DOC_URL, 'whatsnew/')
 DOWNLOADS_URL = urljoin(MAIN_DOC_URL, 'download.html')
 PEP_URL = 'https://peps.python.org/'
+PEP_API_URL = urljoin(PEP_URL, 'api/peps.json')
 
 DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
 
+# HTTP cache configuration constants (TTL in seconds)
+PEP_PAGE_URL_PATTERN = 'peps.python.org/pep-*'
+PEP_INDEX_URL_PATTERN = 'peps.python.org/'
+DOCS_URL_PATTERN = 'docs.python.org/'
+DEFAULT_PEP_TTL = 24 * 60 * 60
+DEFAULT_PEP_INDEX_TTL = 60 * 60
+DEFAULT_DOCS_TTL = 24 * 60 * 60
+
+# Parsed result cache configuration constants
+RESULT_CACHE_FILE = BASE_DIR / 'result_cache.sqlite'
+DEFAULT_RESULT_CACHE_SIZE = 50 * 2**20
+CHANGES_INDEX_FILE = BASE_DIR / 'changes.sqlite'
+
+# In-process parsed page cache configuration constants
+DEFAULT_SOUP_CACHE_SIZE = 64 * 2**20
+# Во сколько раз дерево BeautifulSoup больше текста страницы (оценка)
+SOUP_SIZE_FACTOR = 8
+
+# Connection pool configuration constants
+DEFAULT_POOL_SIZE = 10
+REQUEST_TIMEOUT = 30
+KEEPALIVE_TIMEOUT = 60
+
+# Retry and rate limit configuration constants
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 60
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_RATE_LIMIT = 0
+DEFAULT_RATE_BURST = 1
+
+# Archive download configuration constants
+DOWNLOAD_CHUNK_SIZE = 2**16
+DOWNLOAD_TIMEOUT = 30
+
+# Result server configuration constants
+SERVE_HOST = '127.0.0.1'
+DEFAULT_SERVE_PORT = 8000
+DEFAULT_SERVE_INTERVAL = 3600
+
+# Benchmark configuration constants
+BENCH_CORPUS_FILE = BASE_DIR / 'bench_corpus.zip'
+BENCH_REGRESSION_THRESHOLD = 0.1
+
+# Snapshot of the last pep run for the incremental mode
+PEP_SNAPSHOT_FILE = BASE_DIR / 'pep_snapshot.json'
+
+# Journal of the pep run progress for --resume
+PEP_JOURNAL_FILE = BASE_DIR / 'pep_journal.jsonl'
+JOURNAL_CHECKPOINT_SIZE = 50
+
 EXPECTED_TYPE = ('I', 'P', 'S')
 EXPECTED_STATUS = {
     'A': ('Active', 'Accepted'),
@@ -23,9 +75,20 @@ EXPECTED_STATUS = {
 }
 
 # CLI working mode constants
+ALL_MODES = 'all'
 PRETTY = 'pretty'
 FILE = 'file'
+JSONL = 'jsonl'
+SQLITE = 'sqlite'
+PARQUET = 'parquet'
 DEFAULT = ''
+OUTPUT_BATCH_SIZE = 500
+SQLITE_RESULTS_FILE = 'results.sqlite'
+DEFAULT_WORKERS = 1
+DEFAULT_PARSE_WORKERS = 0
+DEFAULT_MAX_DEPTH = 1
+SYNC_ENGINE = 'sync'
+ASYNC_ENGINE = 'async'
 
 # Logger configuration constants
 LOG_DIR = BASE_DIR / 'logs'
@@ -0,0 +1,254 @@
+import logging
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from constants import (ASYNC_ENGINE, DEFAULT_MAX_DEPTH, DEFAULT_WORKERS,
+                       SYNC_ENGINE)
+from exceptions import (ParserConnectionFailedException,
+                        ParserDataConflictException, ParserFindTagException)
+from frontier import Frontier, create_seen_set, normalize_url
+from metrics import metrics
+from utils import get_record, get_soup, iter_with_session
+
+logger = logging.getLogger(__name__)
+
+# Ошибки отдельной страницы, после которых обход остальных продолжается
+PAGE_ERRORS = (ParserConnectionFailedException, ParserDataConflictException,
+               ParserFindTagException)
+
+links_not_found_error = 'Не найдены ссылки {selector} на странице {url}'
+
+
+def iter_links(session, cli_args, items, func, async_func):
+    """Обрабатывает элементы выбранным движком загрузки и отдаёт пары
+    (результат, ошибка) в порядке элементов. Синхронный движок отдаёт их по
+    мере готовности, асинхронный - после обработки всех элементов."""
+    workers = getattr(cli_args, 'workers', DEFAULT_WORKERS)
+    # Асинхронный движок работает только с сетью, снимок читает сессия
+    if (getattr(cli_args, 'engine', SYNC_ENGINE) == ASYNC_ENGINE
+            and not getattr(cli_args, 'from_snapshot', None)):
+        from async_utils import map_async
+        results = map_async(async_func, items, workers, session=session)
+    else:
+        results = iter_with_session(session, func, items, workers)
+
+    for result, error in results:
+        if error is not None:
+            metrics.count_error(error)
+        yield result, error
+
+
+def map_links(session, cli_args, items, func, async_func):
+    return list(iter_links(session, cli_args, items, func, async_func))
+
+
+class PageFields:
+    """Получение данных страниц функцией extract(soup) для движков загрузки:
+    вызов возвращает пару (данные страницы, ошибка)."""
+    def __init__(self, extract, parse_only=None):
+        self.extract = extract
+        self.parse_only = parse_only
+
+    def __call__(self, session, link):
+        try:
+            return get_record(session, link, self.extract,
+                              self.parse_only), None
+        except PAGE_ERRORS as ex:
+            return None, ex
+
+    async def fetch_async(self, client, link):
+        from async_utils import get_soup_async
+        try:
+            soup = await get_soup_async(client, link, self.parse_only)
+            return self.extract(soup), None
+        except PAGE_ERRORS as ex:
+            return None, ex
+
+
+class FollowLinks:
+    """Извлекает со страницы поля функцией page_fields и ссылки, найденные
+    CSS-селектором, для перехода на следующий уровень обхода."""
+    def __init__(self, page_fields, selector):
+        self.page_fields = page_fields
+        self.selector = selector
+        page_kind = (getattr(page_fields, 'kind', None)
+                     or page_fields.__qualname__)
+        self.kind = f'{type(self).__name__}({page_kind}, {selector})'
+
+    def __call__(self, soup):
+        return (self.page_fields(soup),
+                [a_tag['href'] for a_tag in soup.select(self.selector)
+                 if a_tag.get('href')])
+
+
+def iter_pages(session, cli_args, extractor, links, extract=None):
+    """Отдаёт пары (поля страницы, ошибка) для страниц по ссылкам в порядке
+    ссылок. Страница, ссылки на которую совпадают после нормализации,
+    загружается один раз - по первой из этих ссылок."""
+    keys = [normalize_url(link) for link in links]
+    unique_links = {}
+    for key, link in zip(keys, links):
+        unique_links.setdefault(key, link)
+    page_fields = PageFields(extract or extractor.page_fields,
+                             extractor.page_strainer)
+    pages = iter_links(session, cli_args, list(unique_links.values()),
+                       page_fields, page_fields.fetch_async)
+    results = {}
+    for key in keys:
+        if key not in results:
+            results[key] = next(pages)
+        yield results[key]
+
+
+def create_frontier(cli_args, extractor):
+    """Создаёт очередь обхода цели парсинга. Переход по ссылкам со страниц
+    глубже первого уровня выполняется только для целей с селектором
+    follow_selector."""
+    max_depth = 1
+    if extractor.follow_selector:
+        max_depth = getattr(cli_args, 'max_depth', DEFAULT_MAX_DEPTH)
+    seen = create_seen_set(getattr(cli_args, 'bloom_capacity', 0))
+    domains = extractor.domains or (urlsplit(extractor.start_url).hostname,)
+    return Frontier(max_depth, domains, seen)
+
+
+def iter_frontier_pages(session, cli_args, extractor, frontier):
+    """Обходит страницы очереди по уровням и отдаёт тройки (URL, поля
+    страницы, ошибка). Со страниц, глубина которых меньше предельной,
+    в очередь добавляются ссылки селектора follow_selector."""
+    follow = FollowLinks(extractor.page_fields, extractor.follow_selector)
+    while frontier:
+        batch = frontier.pop_batch()
+        extract = (follow if any(depth < frontier.max_depth
+                                 for _, depth in batch)
+                   else extractor.page_fields)
+        pages = iter_pages(session, cli_args, extractor,
+                           [url for url, _ in batch], extract)
+        for (url, depth), (record, error) in zip(batch, pages):
+            if error is not None or extract is not follow:
+                frontier.finish(url)
+                yield url, record, error
+                continue
+            fields, links = record
+            if depth < frontier.max_depth:
+                for link in links:
+                    add_to_frontier(frontier, extractor, urljoin(url, link),
+                                    depth + 1)
+            frontier.finish(url)
+            yield url, fields, None
+
+
+def get_state_path(cli_args, extractor):
+    """Возвращает файл состояния очереди обхода режима или None."""
+    state_dir = getattr(cli_args, 'frontier_state', None)
+    return Path(state_dir) / f'{extractor.name}.json' if state_dir else None
+
+
+def open_frontier(session, cli_args, extractor, state_path=None):
+    """Возвращает очередь обхода: сохранённую при прерывании прошлого
+    запуска или новую со ссылками стартовой страницы."""
+    if state_path is not None and state_path.exists():
+        frontier = Frontier.load(state_path)
+        logger.info(f'Обход продолжается с сохранённого состояния: '
+                    f'{state_path}, страниц в очереди: {len(frontier)}')
+        return frontier
+    frontier = create_frontier(cli_args, extractor)
+    for link in get_links(session, extractor):
+        add_to_frontier(frontier, extractor, link, 1)
+    return frontier
+
+
+def add_to_frontier(frontier, extractor, url, depth):
+    priority = (extractor.priority(url, depth)
+                if extractor.priority is not None else None)
+    return frontier.add(url, depth, priority)
+
+
+def get_links(session, extractor):
+    """Возвращает абсолютные ссылки со стартовой страницы цели парсинга,
+    найденные её селектором ссылок."""
+    soup = get_soup(session, extractor.start_url, extractor.start_strainer)
+    a_tags = soup.select(extractor.link_selector)
+    if not a_tags:
+        raise ParserFindTagException(links_not_found_error.format(
+            selector=extractor.link_selector, url=extractor.start_url
+        ))
+    return [urljoin(extractor.start_url, a_tag['href']) for a_tag in a_tags]
+
+
+def get_change_rows(kind, records, unknown_keys=()):
+    """Сравнивает записи {ключ: значение} с прошлым запуском режима и
+    возвращает строки результата с изменениями."""
+    from changes import ChangeIndex, iter_change_rows
+
+    index = ChangeIndex()
+    try:
+        changes = index.update(kind, records, unknown_keys)
+    finally:
+        index.close()
+    return list(iter_change_rows(changes))
+
+
+def iter_rows(session, cli_args, extractor):
+    """Отдаёт пары (строка результата, ошибка) цели парсинга: строки
+    стартовой страницы или строки (ссылка, *поля) страниц по ссылкам. Для
+    страницы, которую не удалось обработать, строка содержит только
+    ссылку."""
+    if extractor.index_rows is not None:
+        soup = get_soup(session, extractor.start_url,
+                        extractor.start_strainer)
+        for row in extractor.index_rows(soup):
+            yield tuple(row), None
+        return
+
+    state_path = get_state_path(cli_args, extractor)
+    frontier = open_frontier(session, cli_args, extractor, state_path)
+    pages = iter_frontier_pages(session, cli_args, extractor, frontier)
+    try:
+        for url, fields, error in pages:
+            yield ((url, *fields) if error is None else (url,)), error
+    except (Exception, KeyboardInterrupt, GeneratorExit):
+        if state_path is not None:
+            state_path.parent.mkdir(parents=True, exist_ok=True)
+            frontier.save(state_path)
+            logger.info(f'Состояние обхода сохранено: {state_path}')
+        raise
+    if state_path is not None and state_path.exists():
+        state_path.unlink()
+
+
+def get_changes(extractor, rows, resumed=False):
+    """Строки изменений по первому полю строки (ссылке) как ключу. Строки
+    страниц, которые не удалось загрузить, удалёнными не считаются. При
+    продолжении прерванного обхода удалённые страницы не определяются."""
+    records, failed_keys = {}, set()
+    for row, error in rows:
+        if error is not None:
+            logger.error(error)
+            failed_keys.add(row[0])
+        else:
+            records[row[0]] = list(row[1:])
+    return get_change_rows(extractor.name, records,
+                           None if resumed else failed_keys)
+
+
+def crawl(session, extractor, cli_args=None):
+    """Отдаёт строки результата цели парсинга по мере загрузки страниц.
+    Ошибки отдельных страниц выводятся в лог после всех строк."""
+    state_path = get_state_path(cli_args, extractor)
+    resumed = state_path is not None and state_path.exists()
+    rows = iter_rows(session, cli_args, extractor)
+    if getattr(cli_args, 'changes', False):
+        yield from get_changes(extractor, rows, resumed)
+        return
+
+    yield extractor.header
+    messages_for_logging = []
+    for row, error in rows:
+        if error is not None:
+            messages_for_logging.append(error)
+        else:
+            yield row
+
+    for message in messages_for_logging:
+        logger.error(message)
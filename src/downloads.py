@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests import RequestException
+
+from constants import DOWNLOAD_CHUNK_SIZE, DOWNLOAD_TIMEOUT
+from exceptions import ParserConnectionFailedException, ParserDownloadException
+from utils import connection_error
+
+PARTIAL_CONTENT = 206
+RANGE_NOT_SATISFIABLE = 416
+
+ranges_error = 'Сервер не поддерживает загрузку по частям ({link})'
+size_error = 'Размер загруженного файла {path} не совпадает с ожидаемым'
+checksum_error = 'Контрольная сумма файла {path} не совпадает с ожидаемой'
+
+
+def create_download_session(session):
+    """Создаёт сессию без кеша с транспортом исходной сессии, чтобы
+    архивы не сохранялись в кеш HTTP-ответов."""
+    download_session = requests.Session()
+    download_session.headers.update(session.headers)
+    for prefix, adapter in session.adapters.items():
+        download_session.mount(prefix, adapter)
+    return download_session
+
+
+def get_remote_info(session, url):
+    """Возвращает сведения о файле на сервере по ответу на запрос HEAD."""
+    response = session.head(url, allow_redirects=True,
+                            timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    length = response.headers.get('Content-Length')
+    return {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'length': int(length) if length else None,
+        'ranges': response.headers.get('Accept-Ranges') == 'bytes',
+    }
+
+
+def get_meta_path(path):
+    return path.with_name(f'{path.name}.meta.json')
+
+
+def load_meta(path):
+    try:
+        with open(get_meta_path(path), encoding='UTF-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_meta(path, meta):
+    with open(get_meta_path(path), 'w', encoding='UTF-8') as file:
+        json.dump(meta, file)
+
+
+def is_same_version(meta, remote):
+    """Проверяет, что сохранённые сведения относятся к той же версии файла
+    на сервере."""
+    if remote['etag'] or meta.get('etag'):
+        return meta.get('etag') == remote['etag']
+    return bool(remote['last_modified']) and (
+        meta.get('last_modified') == remote['last_modified']
+        and meta.get('length') == remote['length']
+    )
+
+
+def get_segments(remote, connections):
+    """Делит файл на диапазоны байт [начало, конец] для загрузки в
+    несколько соединений."""
+    length = remote['length']
+    if connections <= 1 or not remote['ranges'] or not length:
+        return [[0, None]]
+    size = -(-length // connections)
+    return [
+        [start, min(start + size, length) - 1]
+        for start in range(0, length, size)
+    ]
+
+
+def get_part_paths(path, segments):
+    if len(segments) == 1:
+        return [path.with_name(f'{path.name}.part')]
+    return [
+        path.with_name(f'{path.name}.part{index}')
+        for index in range(len(segments))
+    ]
+
+
+def download_segment(session, url, part_path, segment, validator=None,
+                     length=None):
+    """Загружает диапазон байт в файл part_path, продолжая с места
+    остановки, если файл уже частично загружен.
+
+    length - размер файла на сервере, если он известен: по нему уже
+    загруженный целиком файл без диапазона не запрашивается повторно.
+    """
+    start, end = segment
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    size = length if end is None else end - start + 1
+    if size is not None and offset >= size:
+        return
+
+    headers = {}
+    if offset or end is not None:
+        last_byte = '' if end is None else end
+        headers['Range'] = f'bytes={start + offset}-{last_byte}'
+        if validator:
+            headers['If-Range'] = validator
+
+    with session.get(url, headers=headers, stream=True,
+                     timeout=DOWNLOAD_TIMEOUT) as response:
+        if offset and response.status_code == RANGE_NOT_SATISFIABLE:
+            # Сохранённая часть не соответствует файлу: загружаем её заново
+            part_path.unlink()
+            return download_segment(session, url, part_path, segment,
+                                    validator, length)
+        response.raise_for_status()
+        if headers and response.status_code != PARTIAL_CONTENT:
+            if end is not None:
+                raise ParserDownloadException(ranges_error.format(link=url))
+            # Сервер прислал файл целиком: начинаем запись заново
+            offset = 0
+        with open(part_path, 'ab' if offset else 'wb') as file:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+
+
+def join_parts(part_paths, path):
+    if len(part_paths) == 1:
+        os.replace(part_paths[0], path)
+        return
+    with open(path, 'wb') as file:
+        for part_path in part_paths:
+            with open(part_path, 'rb') as part:
+                for chunk in iter(lambda: part.read(DOWNLOAD_CHUNK_SIZE),
+                                  b''):
+                    file.write(chunk)
+            part_path.unlink()
+
+
+def get_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(DOWNLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def remove_stale_parts(path):
+    for part_path in path.parent.glob(f'{path.name}.part*'):
+        part_path.unlink()
+
+
+def verify_file(path, remote, sha256=None):
+    if remote['length'] is not None and (
+            path.stat().st_size != remote['length']):
+        path.unlink()
+        raise ParserDownloadException(size_error.format(path=path))
+    if sha256 and get_sha256(path) != sha256.lower():
+        path.unlink()
+        raise ParserDownloadException(checksum_error.format(path=path))
+
+
+def download_file(session, url, path, connections=1, sha256=None):
+    """Загружает файл потоково, в обход кеша HTTP-ответов.
+
+    Незавершённая загрузка продолжается с места остановки по заголовку
+    Range, если файл на сервере не изменился. Возвращает False, если
+    загруженный ранее файл актуален и загрузка не потребовалась.
+    """
+    download_session = create_download_session(session)
+    try:
+        remote = get_remote_info(download_session, url)
+        meta = load_meta(path)
+        if meta.get('complete') and path.exists() and (
+                is_same_version(meta, remote)):
+            return False
+
+        segments = get_segments(remote, connections)
+        if not is_same_version(meta, remote) or (
+                meta.get('segments') != segments):
+            remove_stale_parts(path)
+        remote['segments'] = segments
+        save_meta(path, {**remote, 'complete': False})
+        part_paths = get_part_paths(path, segments)
+        validator = remote['etag'] or remote['last_modified']
+        with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+            list(executor.map(
+                lambda args: download_segment(download_session, url,
+                                              *args, validator,
+                                              remote['length']),
+                zip(part_paths, segments)
+            ))
+    except RequestException:
+        raise ParserConnectionFailedException(
+            connection_error.format(link=url)
+        )
+
+    join_parts(part_paths, path)
+    verify_file(path, remote, sha256)
+    save_meta(path, {**remote, 'complete': True})
+    return True
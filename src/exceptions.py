@@ -12,3 +12,7 @@ class ParserFindTagException(Exception):
 
 class ParserDataConflictException(Exception):
     """Вызывается, при несоответствии спарсеных данных между собой."""
+
+
+class ParserDownloadException(Exception):
+    """Вызывается, когда загруженный файл не прошёл проверку."""
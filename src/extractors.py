@@ -0,0 +1,143 @@
+import re
+
+from constants import DOWNLOADS_URL, MAIN_DOC_URL, PEP_URL, WHATS_NEW_URL
+from exceptions import ParserFindDataException
+from pep import STATUS_STRAINER, find_status
+from utils import LazyStrainer, find_tag, select_tag
+
+
+class Extractor:
+    """Декларативное описание цели парсинга для общего движка обхода.
+
+    Дерево стартовой страницы start_url строится по части start_strainer.
+    Строки результата с заголовками header берутся либо со стартовой
+    страницы функцией index_rows(soup), либо со страниц по ссылкам,
+    найденным CSS-селектором link_selector: тогда строка состоит из ссылки
+    и полей, извлечённых функцией page_fields(soup) из части страницы
+    page_strainer. Функция page_fields должна быть определена на уровне
+    модуля, чтобы разбор страниц можно было вынести в отдельные процессы.
+
+    Если задан селектор follow_selector, то со страниц по ссылкам обход
+    продолжается по найденным им ссылкам до глубины --max-depth (часть
+    page_strainer должна содержать эти ссылки). Обход не выходит за хосты
+    domains (по умолчанию - хост start_url); функция priority(url, depth)
+    задаёт порядок обхода страниц одного уровня, по умолчанию - порядок
+    ссылок.
+    """
+    def __init__(self, name, start_url, header=(), start_strainer=None,
+                 index_rows=None, link_selector=None, page_strainer=None,
+                 page_fields=None, follow_selector=None, domains=(),
+                 priority=None):
+        self.name = name
+        self.start_url = start_url
+        self.header = tuple(header)
+        self.start_strainer = start_strainer
+        self.index_rows = index_rows
+        self.link_selector = link_selector
+        self.page_strainer = page_strainer
+        self.page_fields = page_fields
+        self.follow_selector = follow_selector
+        self.domains = tuple(domains)
+        self.priority = priority
+
+
+class SelectFields:
+    """Извлекает со страницы текст тегов по CSS-селекторам полей.
+
+    Поле задаётся парой (селектор, обязательное ли поле). Если тег
+    обязательного поля не найден, вызывается ParserFindTagException, для
+    необязательного поля возвращается пустая строка.
+    """
+    def __init__(self, *fields):
+        self.fields = fields
+        # Тип записи в кеше результатов зависит от набора полей
+        self.kind = f'{type(self).__name__}{fields}'
+
+    def __call__(self, soup):
+        values = []
+        for selector, required in self.fields:
+            if required:
+                tag = select_tag(soup, selector)
+            else:
+                tag = soup.select_one(selector)
+            values.append(tag.text.replace('\n', ' ').strip() if tag else '')
+        return tuple(values)
+
+
+# Зарегистрированные цели парсинга {имя режима: описание}
+EXTRACTORS = {}
+
+
+def register(extractor):
+    EXTRACTORS[extractor.name] = extractor
+    return extractor
+
+
+# Части страниц, по которым строится дерево тегов в каждом из режимов
+WHATS_NEW_INDEX_STRAINER = LazyStrainer(attrs={'id': 'what-s-new-in-python'})
+WHATS_NEW_PAGE_STRAINER = LazyStrainer(['h1', 'dl'])
+PEP_INDEX_STRAINER = LazyStrainer(attrs={'id': 'numerical-index'})
+
+parse_whats_new_page = SelectFields(('h1', True), ('dl.field-list', False))
+
+
+def iter_latest_versions_rows(soup):
+    """Отдаёт ссылки, номера и статусы версий из списка всех версий."""
+    ul_tags = soup.select('div.sphinxsidebarwrapper > ul')
+    for ul in ul_tags:
+        if 'All versions' in ul.text:
+            a_tags = ul.find_all('a')
+            break
+    else:
+        raise ParserFindDataException('Не найден список c версиями Python')
+
+    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
+    for a_tag in a_tags:
+        link = a_tag['href']
+        text_matched = re.search(pattern, a_tag.text)
+        if text_matched:
+            version, status = text_matched.groups()
+        else:
+            version, status = a_tag.text, ''
+        yield link, version, status
+
+
+def iter_pep_index_rows(soup):
+    """Отдаёт строки общего списка PEP: (ключи, номер, название, ссылка)."""
+    from urllib.parse import urljoin
+
+    for line in soup.select('#numerical-index tbody tr'):
+        abbr, number, name, *_ = line.find_all('td')
+        link = find_tag(name, 'a').get('href')
+        yield abbr.string, number.string, name.string, urljoin(PEP_URL, link)
+
+
+WHATS_NEW = register(Extractor(
+    'whats-new', WHATS_NEW_URL,
+    header=('Ссылка на статью', 'Заголовок', 'Редактор, Автор'),
+    start_strainer=WHATS_NEW_INDEX_STRAINER,
+    link_selector='#what-s-new-in-python > div.toctree-wrapper '
+                  'li.toctree-l1 > a',
+    page_strainer=WHATS_NEW_PAGE_STRAINER,
+    page_fields=parse_whats_new_page,
+))
+
+LATEST_VERSIONS = register(Extractor(
+    'latest-versions', MAIN_DOC_URL,
+    header=('Ссылка на документацию', 'Версия', 'Статус'),
+    index_rows=iter_latest_versions_rows,
+))
+
+DOWNLOAD = register(Extractor(
+    'download', DOWNLOADS_URL,
+    link_selector='div.body > table.docutils a[href$="pdf-a4.zip"]',
+))
+
+PEP = register(Extractor(
+    'pep', PEP_URL,
+    header=('Статус', 'Количество'),
+    start_strainer=PEP_INDEX_STRAINER,
+    index_rows=iter_pep_index_rows,
+    page_strainer=STATUS_STRAINER,
+    page_fields=find_status,
+))
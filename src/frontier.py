@@ -0,0 +1,200 @@
+import base64
+import hashlib
+import heapq
+import json
+import math
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+INDEX_PAGE = 'index.html'
+
+
+def normalize_url(url):
+    """Возвращает URL в виде, по которому сравниваются страницы: схема
+    https, хост в нижнем регистре без порта по умолчанию, без фрагмента и
+    без index.html в конце пути."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{parts.port}'
+    if scheme == 'http':
+        scheme = 'https'
+
+    path = parts.path or '/'
+    if path.endswith('/' + INDEX_PAGE):
+        path = path[:-len(INDEX_PAGE)]
+    return urlunsplit((scheme, netloc, path, parts.query, ''))
+
+
+class UrlSet:
+    """Точное множество просмотренных URL."""
+    kind = 'set'
+
+    def __init__(self, urls=()):
+        self._urls = set(urls)
+
+    def add(self, url):
+        self._urls.add(url)
+
+    def __contains__(self, url):
+        return url in self._urls
+
+    def __len__(self):
+        return len(self._urls)
+
+    def get_state(self):
+        return {'urls': sorted(self._urls)}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state['urls'])
+
+
+class BloomFilter:
+    """Множество просмотренных URL фиксированного размера.
+
+    Размер битового массива рассчитывается по ожидаемому числу URL capacity
+    и доле ложных срабатываний error_rate. Ложное срабатывание означает, что
+    новая страница будет считаться просмотренной; пропусков уже
+    просмотренных страниц не бывает.
+    """
+    kind = 'bloom'
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2
+        ))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def get_positions(self, url):
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size
+                for i in range(self.hash_count)]
+
+    def add(self, url):
+        for position in self.get_positions(url):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, url):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self.get_positions(url))
+
+    def __len__(self):
+        return self.count
+
+    def get_state(self):
+        return {
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'count': self.count,
+            'bits': base64.b64encode(self.bits).decode('ascii'),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        bloom = cls(state['capacity'], state['error_rate'])
+        bloom.bits = bytearray(base64.b64decode(state['bits']))
+        bloom.count = state['count']
+        return bloom
+
+
+SEEN_SETS = {seen_set.kind: seen_set for seen_set in (UrlSet, BloomFilter)}
+
+
+def create_seen_set(bloom_capacity=0):
+    """Возвращает множество просмотренных URL: точное или, если задано
+    ожидаемое число URL, фильтр Блума."""
+    return BloomFilter(bloom_capacity) if bloom_capacity else UrlSet()
+
+
+class Frontier:
+    """Очередь страниц обхода.
+
+    Страница добавляется один раз за обход: повторы определяются по
+    нормализованному URL, а загружается ссылка в том виде, в котором она
+    была добавлена первой. Страницы глубже max_depth и страницы хостов не
+    из domains не добавляются. Страницы отдаются по возрастанию
+    приоритета (по умолчанию приоритет - глубина), при равном приоритете -
+    в порядке добавления.
+    Состояние очереди, включая полученные из неё, но не отмеченные
+    обработанными страницы, сохраняется в файл JSON для продолжения обхода.
+    """
+    def __init__(self, max_depth=1, domains=(), seen=None):
+        self.max_depth = max_depth
+        self.domains = frozenset(domain.lower() for domain in domains)
+        self.seen = UrlSet() if seen is None else seen
+        self._queue = []
+        # Страницы, полученные из очереди, обработка которых не завершена
+        self._pending = {}
+        self._added = 0
+
+    def add(self, url, depth=0, priority=None):
+        """Добавляет страницу в очередь и возвращает её нормализованный URL
+        или None, если страница уже встречалась или вне ограничений."""
+        key = normalize_url(url)
+        if depth > self.max_depth or key in self.seen:
+            return None
+        if self.domains and urlsplit(key).hostname not in self.domains:
+            return None
+        self.seen.add(key)
+        heapq.heappush(self._queue, (
+            depth if priority is None else priority, self._added, depth, url
+        ))
+        self._added += 1
+        return key
+
+    def pop(self):
+        """Возвращает пару (URL, глубина) следующей страницы."""
+        entry = heapq.heappop(self._queue)
+        _, _, depth, url = entry
+        self._pending[url] = entry
+        return url, depth
+
+    def finish(self, url):
+        """Отмечает полученную из очереди страницу обработанной."""
+        self._pending.pop(url, None)
+
+    def pop_batch(self, limit=None):
+        """Возвращает до limit следующих страниц (все, если limit=None)."""
+        count = len(self._queue) if limit is None else limit
+        return [self.pop() for _ in range(min(count, len(self._queue)))]
+
+    def __len__(self):
+        return len(self._queue)
+
+    def get_state(self):
+        return {
+            'max_depth': self.max_depth,
+            'domains': sorted(self.domains),
+            'seen': {'kind': self.seen.kind, **self.seen.get_state()},
+            # Необработанные страницы при продолжении обхода загружаются снова
+            'queue': sorted([*self._queue, *self._pending.values()]),
+            'added': self._added,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        seen_state = state['seen']
+        frontier = cls(state['max_depth'], state['domains'],
+                       SEEN_SETS[seen_state['kind']].from_state(seen_state))
+        frontier._queue = [tuple(item) for item in state['queue']]
+        heapq.heapify(frontier._queue)
+        frontier._added = state['added']
+        return frontier
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.get_state(), file)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as file:
+            return cls.from_state(json.load(file))
@@ -0,0 +1,110 @@
+import json
+import os
+from collections import Counter
+
+from constants import JOURNAL_CHECKPOINT_SIZE
+
+
+class Journal:
+    """Журнал выполненных элементов долгого обхода для продолжения после
+    прерывания.
+
+    Файл JSON Lines начинается с ключа запуска (например, хеша списка
+    элементов), затем идут записи выполненных элементов и контрольные
+    точки с числом выполненных элементов и количеством значений. Записи
+    сбрасываются на диск в каждой контрольной точке, через каждые
+    checkpoint_size записей. Повреждённая последняя строка (процесс
+    завершён во время записи) при чтении пропускается. Журнал без пути
+    (path=None) ведётся только в памяти.
+    """
+    def __init__(self, path, key, checkpoint_size=JOURNAL_CHECKPOINT_SIZE):
+        self.path = path
+        self.key = key
+        self.checkpoint_size = checkpoint_size
+        self.completed = {}
+        self.counts = Counter()
+        self._pending = 0
+        self._file = None
+
+    @classmethod
+    def open(cls, path, key, resume=False, **kwargs):
+        """Открывает журнал запуска. При resume=True выполненные элементы
+        берутся из журнала того же запуска и новые записи дописываются в
+        него, иначе журнал начинается заново."""
+        journal = cls(path, key, **kwargs)
+        if path is None:
+            return journal
+        end = journal.read() if resume else 0
+        if end:
+            journal.counts.update(journal.completed.values())
+            journal._file = open(path, 'r+b')
+            journal._file.truncate(end)
+            journal._file.seek(end)
+        else:
+            journal._file = open(path, 'wb')
+            journal.write({'key': key})
+        journal.checkpoint()
+        return journal
+
+    def read(self):
+        """Читает выполненные элементы из журнала запуска с тем же ключом и
+        возвращает размер прочитанной части файла в байтах (0, если журнала
+        этого запуска нет)."""
+        end = 0
+        try:
+            with open(self.path, 'rb') as file:
+                for number, line in enumerate(file):
+                    if not line.endswith(b'\n'):
+                        break
+                    record = json.loads(line)
+                    if number == 0 and record.get('key') != self.key:
+                        return 0
+                    if 'item' in record:
+                        self.completed[record['item']] = record['value']
+                    end += len(line)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            pass
+        return end
+
+    def write(self, record):
+        if self._file is None:
+            return
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        self._file.write(line.encode('UTF-8'))
+
+    def add(self, item_key, value):
+        """Отмечает элемент выполненным."""
+        if item_key in self.completed:
+            return
+        self.completed[item_key] = value
+        self.counts[value] += 1
+        self.write({'item': item_key, 'value': value})
+        self._pending += 1
+        if self._pending >= self.checkpoint_size:
+            self.checkpoint()
+
+    def checkpoint(self):
+        if self._file is None:
+            return
+        self.write({'checkpoint': len(self.completed),
+                    'counts': dict(self.counts)})
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self.checkpoint()
+            self._file.close()
+
+    def remove(self):
+        """Закрывает и удаляет журнал завершённого запуска."""
+        self.close()
+        if self.path is None:
+            return
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
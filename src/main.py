@@ -1,89 +1,45 @@
 import logging
-import re
-from urllib.parse import urljoin
-
-import requests_cache
-from tqdm import tqdm
+import threading
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 
 from configs import configure_argument_parser, configure_logging
-from constants import (BASE_DIR, DOWNLOADS_URL, EXPECTED_STATUS, MAIN_DOC_URL,
-                       PEP_URL, WHATS_NEW_URL)
+from constants import ALL_MODES, BASE_DIR, PEP_API_URL
+from crawler import crawl, get_change_rows, get_links, iter_pages
 from exceptions import (ParserConnectionFailedException,
-                        ParserDataConflictException, ParserFindDataException,
-                        ParserFindTagException)
+                        ParserDataConflictException)
+from extractors import DOWNLOAD, EXTRACTORS, LATEST_VERSIONS, PEP, WHATS_NEW
+from metrics import metrics
 from outputs import control_output
-from pep import PythonPEP
-from utils import find_tag, get_response, get_soup, select_tag
+from pep import (PEPCollection, get_journal_path, get_snapshot_status,
+                 load_snapshot, open_journal, save_snapshot)
+from soup_cache import soup_cache
+from utils import clone_session, get_response, get_soup
 
 logger = logging.getLogger(__name__)
-configure_logging(logger)
-
-
-def whats_new(session):
-    soup = get_soup(session, WHATS_NEW_URL)
-
-    div = select_tag(soup, '#what-s-new-in-python > div.toctree-wrapper')
-    items = div.select('li.toctree-l1')
-
-    links = [urljoin(WHATS_NEW_URL, item.a['href']) for item in items]
 
-    result = [('Ссылка на статью', 'Заголовок', 'Редактор, Автор')]
-    messages_for_logging = []
-    for link in tqdm(links):
-        try:
-            new_soup = get_soup(session, link)
 
-            h1 = select_tag(new_soup, 'div.body section > h1')
-            dl = new_soup.select_one('div.body section > dl.field-list')
+def iter_whats_new(session, cli_args=None):
+    """Отдаёт строки результата режима whats-new по мере загрузки статей."""
+    return crawl(session, WHATS_NEW, cli_args)
 
-            result.append(
-                (link,
-                 h1.text,
-                 dl.text.replace('\n', ' ').strip() if dl else '')
-            )
-        except ParserConnectionFailedException as ex:
-            messages_for_logging.append(ex)
-        except ParserFindTagException as ex:
-            messages_for_logging.append(ex)
 
-    for message in messages_for_logging:
-        logger.error(message)
+def whats_new(session, cli_args=None):
+    return list(iter_whats_new(session, cli_args))
 
-    return result
-
-
-def latest_versions(session):
-    soup = get_soup(session, MAIN_DOC_URL)
-
-    ul_tags = soup.select('div.sphinxsidebarwrapper > ul')
-    for ul in ul_tags:
-        if 'All versions' in ul.text:
-            a_tags = ul.find_all('a')
-            break
-    else:
-        raise ParserFindDataException('Не найден список c версиями Python')
 
-    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
+def iter_latest_versions(session, cli_args=None):
+    """Отдаёт строки результата режима latest-versions."""
+    return crawl(session, LATEST_VERSIONS, cli_args)
 
-    result = [('Ссылка на документацию', 'Версия', 'Статус')]
-    for a_tag in a_tags:
-        link = a_tag['href']
-        text_matched = re.search(pattern, a_tag.text)
-        if text_matched:
-            version, status = text_matched.groups()
-        else:
-            version, status = a_tag.text, ''
-        result.append((link, version, status))
 
-    return result
+def latest_versions(session, cli_args=None):
+    return list(iter_latest_versions(session, cli_args))
 
 
-def download(session):
-    soup = get_soup(session, DOWNLOADS_URL)
-
-    table_tag = select_tag(soup, 'div.body > table.docutils')
-    a_tag = find_tag(table_tag, 'a', {'href': re.compile(r'.+pdf-a4\.zip$')})
-    archive_url = urljoin(DOWNLOADS_URL, a_tag.get('href'))
+def download(session, cli_args=None):
+    archive_url, *_ = get_links(session, DOWNLOAD)
 
     # подготовка папки для записи файла
     filename = archive_url.split('/')[-1]
@@ -99,51 +55,154 @@ def download(session):
     archive_path = downloads_dir / filename
 
     # скачивание файла
-    response = get_response(session, archive_url)
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
-
-    logger.info(f'Архив был загружен и сохранён: {archive_path}')
-
-
-def pep(session):
-    soup = get_soup(session, PEP_URL)
+    from downloads import download_file
+    downloaded = download_file(session, archive_url, archive_path,
+                               getattr(cli_args, 'connections', 1),
+                               getattr(cli_args, 'sha256', None))
 
-    lines = soup.select('#numerical-index tbody tr')
-    peps = []
-    for line in lines:
-        abbr, number, name, *_ = line.find_all('td')
-        type_key, status_key = abbr.string[0], abbr.string[1:]
-        link = find_tag(name, 'a').get('href')
-        peps.append(
-            PythonPEP(number.string, name.string, type_key, status_key,
-                      urljoin(PEP_URL, link))
-        )
+    if downloaded:
+        logger.info(f'Архив был загружен и сохранён: {archive_path}')
+    else:
+        logger.info(f'Архив актуален, загрузка не требуется: {archive_path}')
 
-    result = {'Unknown': 0}
-    messages_for_logging = []
-    for pep_item in tqdm(peps):
-        status = None
-        try:
-            status = pep_item.get_status(session)
-        except ParserConnectionFailedException as ex:
-            messages_for_logging.append(ex)
-        except ParserDataConflictException as ex:
-            messages_for_logging.append(ex)
 
+def get_bulk_statuses(session):
+    """Возвращает словарь {номер PEP: статус} из JSON API сайта PEP."""
+    try:
+        data = get_response(session, PEP_API_URL).json()
+    except ParserConnectionFailedException as ex:
+        logger.warning(f'{ex}; статусы будут получены со страниц PEP')
+        return {}
+    except ValueError:
+        logger.warning(f'Некорректный ответ JSON API ({PEP_API_URL}); '
+                       'статусы будут получены со страниц PEP')
+        return {}
+    return {
+        number: fields['status']
+        for number, fields in data.items() if fields.get('status')
+    }
+
+
+def set_pep_status(peps, index, status):
+    """Записывает статус PEP из общего источника и возвращает его или None
+    при несовпадении с ключом статуса."""
+    try:
+        return peps.set_status(index, status)
+    except ParserDataConflictException as ex:
+        metrics.count_error(ex)
+        logger.error(ex)
+        return None
+
+
+def set_page_status(peps, index, page):
+    """Записывает статус PEP из результата загрузки его страницы. Если поля
+    Status на странице нет, статус не записывается."""
+    status, error = page
+    if error is not None:
+        logger.error(error)
+    if error is not None or status is None:
+        return None
+    return set_pep_status(peps, index, status)
+
+
+def get_known_statuses(session, cli_args, peps):
+    """Возвращает статусы {индекс PEP: статус}, известные без загрузки
+    страниц: из снимка прошлого запуска (incremental) и из JSON API (bulk)."""
+    known_statuses = {}
+    if getattr(cli_args, 'incremental', False):
+        snapshot = load_snapshot()
+        for index, key_row in enumerate(peps.get_key_rows()):
+            status = get_snapshot_status(key_row, snapshot)
+            if status is not None:
+                known_statuses[index] = status
+        logger.info(f'Статусы {len(known_statuses)} PEP из {len(peps)} '
+                    'взяты из снимка прошлого запуска')
+
+    if getattr(cli_args, 'bulk', False):
+        bulk_statuses = get_bulk_statuses(session)
+        for index, number in enumerate(peps.numbers):
+            status = bulk_statuses.get(str(number))
+            if status is not None:
+                known_statuses[index] = status
+    return known_statuses
+
+
+def get_journal_statuses(journal, peps):
+    """Возвращает статусы {индекс PEP: статус} из журнала прерванного
+    запуска."""
+    journal_statuses = {}
+    for index, number in enumerate(peps.numbers):
+        status = journal.completed.get(str(number))
+        if status is not None:
+            journal_statuses[index] = status
+    if journal_statuses:
+        logger.info(f'Статусы {len(journal_statuses)} PEP из {len(peps)} '
+                    'взяты из журнала прерванного запуска')
+    return journal_statuses
+
+
+def set_pep_statuses(session, cli_args, peps, journal):
+    """Записывает статусы PEP в хранилище по мере получения. Со страниц
+    загружаются только PEP, статус которых не известен заранее. Полученные
+    статусы отмечаются в журнале запуска."""
+    known_statuses = {**get_known_statuses(session, cli_args, peps),
+                      **get_journal_statuses(journal, peps)}
+
+    missing = []
+    for index in range(len(peps)):
+        status = known_statuses.get(index)
         if status is None:
-            message = f'Ошибка получения статуса для PEP {pep_item.link}'
-            messages_for_logging.append(message)
-        if status not in EXPECTED_STATUS[pep_item.status_key]:
-            result['Unknown'] += 1
-        else:
-            result[status] = result[status] + 1 if result.get(status) else 1
-
-    for message in messages_for_logging:
-        logger.error(message)
+            missing.append(index)
+            continue
+        set_pep_status(peps, index, status)
+        journal.add(str(peps.numbers[index]), status)
+
+    # Записи PythonPEP нужны только для PEP, страницы которых загружаются
+    pages = iter_pages(session, cli_args, PEP,
+                       [peps[index].link for index in missing])
+    for index, page in zip(missing, pages):
+        set_page_status(peps, index, page)
+        status = peps.get_status(index)
+        if status:
+            journal.add(str(peps.numbers[index]), status)
+
+
+def pep(session, cli_args=None):
+    soup = get_soup(session, PEP.start_url, PEP.start_strainer)
+    peps = PEPCollection.from_rows(PEP.index_rows(soup))
+
+    journal = open_journal(peps, getattr(cli_args, 'resume', False),
+                           get_journal_path(cli_args))
+    try:
+        set_pep_statuses(session, cli_args, peps, journal)
+    finally:
+        journal.close()
+    journal.remove()
+    if getattr(cli_args, 'incremental', False):
+        save_snapshot(peps)
+
+    for pep_item in peps.mismatches():
+        logger.error(f'Ошибка получения статуса для PEP {pep_item.link}')
+
+    if getattr(cli_args, 'changes', False):
+        # PEP без полученного статуса не считаются удалёнными
+        statuses = list(map(peps.get_status, range(len(peps))))
+        rows = zip(peps.numbers, peps.names, statuses)
+        return get_change_rows(
+            'pep',
+            {str(number): [name, status]
+             for number, name, status in rows if status},
+            {str(number) for number, status in zip(peps.numbers, statuses)
+             if not status},
+        )
 
-    result['Total'] = len(peps)
-    return [('Статус', 'Количество')] + [(k, v) for k, v in result.items()]
+    status_counts = peps.count_by_status()
+    result = {
+        'Unknown': len(peps) - sum(status_counts.values()),
+        **status_counts,
+        'Total': len(peps),
+    }
+    return [PEP.header] + [(k, v) for k, v in result.items()]
 
 
 MODE_TO_FUNCTION = {
@@ -153,26 +212,118 @@ MODE_TO_FUNCTION = {
     'pep': pep
 }
 
+# Режимы, строки результата которых выводятся по мере получения
+MODE_TO_GENERATOR = {
+    'whats-new': iter_whats_new,
+    'latest-versions': iter_latest_versions,
+}
+
+
+def report_metrics(cli_args):
+    if cli_args.metrics:
+        header, *rows = metrics.summary_rows()
+        from prettytable import PrettyTable
+        table = PrettyTable()
+        table.field_names = header
+        table.align = 'l'
+        table.add_rows(rows)
+        logger.info(f'Метрики запуска:\n{table}')
+    if cli_args.metrics_file:
+        metrics.dump(cli_args.metrics_file)
+        logger.info(f'Метрики сохранены: {cli_args.metrics_file}')
+
+
+def get_available_modes():
+    """Возвращает режимы парсера: режимы MODE_TO_FUNCTION и остальные
+    зарегистрированные цели парсинга."""
+    return [*MODE_TO_FUNCTION,
+            *(name for name in EXTRACTORS if name not in MODE_TO_FUNCTION)]
+
+
+def get_mode_function(mode, streaming=False):
+    """Возвращает функцию режима. Для streaming=True функция режима может
+    отдавать строки результата по мере их получения."""
+    if mode in MODE_TO_FUNCTION:
+        if streaming:
+            return MODE_TO_GENERATOR.get(mode, MODE_TO_FUNCTION[mode])
+        return MODE_TO_FUNCTION[mode]
+
+    extractor = EXTRACTORS[mode]
+    if streaming:
+        return lambda session, cli_args=None: crawl(session, extractor,
+                                                    cli_args)
+    return lambda session, cli_args=None: list(crawl(session, extractor,
+                                                     cli_args))
+
+
+def get_modes(cli_args):
+    """Возвращает выбранные режимы без повторов в порядке их указания."""
+    if ALL_MODES in cli_args.mode:
+        return get_available_modes()
+    return list(dict.fromkeys(cli_args.mode))
+
+
+def run_mode(session, mode_args, output_lock=None):
+    """Выполняет режим и выводит его результат. Если передана блокировка
+    вывода, результат собирается целиком и выводится под ней, чтобы вывод
+    параллельно работающих режимов не перемешивался."""
+    mode = mode_args.mode
+    mode_function = get_mode_function(mode, streaming=output_lock is None)
+    if output_lock is None:
+        output_lock = nullcontext()
+    try:
+        results = mode_function(session, mode_args)
+        with output_lock:
+            if results:
+                control_output(results, mode_args)
+            logger.info(f'Режим {mode} завершил работу.')
+    except Exception as ex:
+        metrics.count_error(ex)
+        logger.error(ex)
+
+
+def run_modes(session, cli_args):
+    """Выполняет выбранные режимы с общей сессией и кешами. Несколько
+    режимов выполняются параллельно, каждый со своим выводом результата."""
+    modes_args = [
+        Namespace(**{**vars(cli_args), 'mode': mode})
+        for mode in get_modes(cli_args)
+    ]
+    if len(modes_args) == 1:
+        run_mode(session, modes_args[0])
+        return
+
+    output_lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=len(modes_args)) as executor:
+        list(executor.map(
+            lambda mode_args: run_mode(clone_session(session), mode_args,
+                                       output_lock),
+            modes_args
+        ))
+
 
 def main():
+    configure_logging(logger)
+    configure_logging(logging.getLogger('outputs'))
+    configure_logging(logging.getLogger('crawler'))
     logger.info('Парсер запущен!')
 
-    arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+    arg_parser = configure_argument_parser([*get_available_modes(), ALL_MODES])
     args = arg_parser.parse_args()
     logger.info(f'Аргументы командной строки: {args}')
 
-    session = requests_cache.CachedSession()
-    if args.clear_cache:
-        session.cache.clear()
-
-    parser_mode = args.mode
+    from sessions import create_session
+    soup_cache.configure(args.soup_cache_size)
+    session = create_session(args,
+                             pool_size=args.workers * len(get_modes(args)))
     try:
-        results = MODE_TO_FUNCTION[parser_mode](session)
-        if results:
-            control_output(results, args)
-        logger.info('Парсер завершил работу.')
-    except Exception as ex:
-        logger.error(ex)
+        run_modes(session, args)
+    finally:
+        if hasattr(session, 'parse_pool'):
+            session.parse_pool.shutdown()
+    logger.info('Парсер завершил работу.')
+    logger.info(session.stats)
+    report_metrics(args)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+STAGES = ('network', 'cache', 'parse', 'select')
+
+PROMETHEUS_PREFIX = 'pep_parser'
+
+
+class Metrics:
+    """Потокобезопасный сборщик времени этапов обработки страниц и
+    счётчиков событий за один запуск парсера."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.timings = defaultdict(lambda: defaultdict(float))
+        self.counters = Counter()
+        self.errors = Counter()
+
+    def add_time(self, stage, url, seconds):
+        with self._lock:
+            self.timings[url][stage] += seconds
+            self.counters[f'{stage}_calls'] += 1
+
+    @contextmanager
+    def timer(self, stage, url):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, url, time.perf_counter() - started)
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def count_error(self, error):
+        with self._lock:
+            self.errors[type(error).__name__] += 1
+
+    def record_response(self, url, response, seconds):
+        """Учитывает время получения ответа и его источник (кеш или сеть)."""
+        from_cache = getattr(response, 'from_cache', False)
+        self.add_time('cache' if from_cache else 'network', url, seconds)
+        if hasattr(response, 'from_cache'):
+            self.increment('cache_hits' if from_cache else 'cache_misses')
+        if not from_cache:
+            self.increment('bytes_transferred', len(response.content))
+
+    def stage_totals(self):
+        with self._lock:
+            totals = Counter()
+            for stages in self.timings.values():
+                totals.update(stages)
+            return totals
+
+    def summary_rows(self):
+        """Возвращает сводку запуска в виде строк таблицы."""
+        totals = self.stage_totals()
+        rows = [('Показатель', 'Значение')]
+        for stage in STAGES:
+            calls = self.counters[f'{stage}_calls']
+            rows.append((f'Этап {stage}, с (вызовов: {calls})',
+                         f'{totals[stage]:.3f}'))
+        for name in ('cache_hits', 'cache_misses', 'bytes_transferred'):
+            rows.append((name, self.counters[name]))
+        for name, count in sorted(self.errors.items()):
+            rows.append((f'Ошибки {name}', count))
+        return rows
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'errors': dict(self.errors),
+                'urls': {url: dict(stages)
+                         for url, stages in self.timings.items()},
+            }
+
+    def to_prometheus(self):
+        """Возвращает метрики в текстовом формате Prometheus."""
+        lines = [f'# TYPE {PROMETHEUS_PREFIX}_stage_seconds_total counter']
+        for stage, seconds in sorted(self.stage_totals().items()):
+            lines.append(f'{PROMETHEUS_PREFIX}_stage_seconds_total'
+                         f'{{stage="{stage}"}} {seconds:.6f}')
+        lines.append(f'# TYPE {PROMETHEUS_PREFIX}_events_total counter')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'{PROMETHEUS_PREFIX}_events_total'
+                         f'{{name="{name}"}} {value}')
+        lines.append(f'# TYPE {PROMETHEUS_PREFIX}_errors_total counter')
+        for name, value in sorted(self.errors.items()):
+            lines.append(f'{PROMETHEUS_PREFIX}_errors_total'
+                         f'{{exception="{name}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """Сохраняет метрики в файл: *.prom - в формате Prometheus,
+        иначе в JSON."""
+        with open(path, 'w', encoding='UTF-8') as file:
+            if str(path).endswith('.prom'):
+                file.write(self.to_prometheus())
+            else:
+                json.dump(self.as_dict(), file, ensure_ascii=False, indent=2)
+
+
+metrics = Metrics()
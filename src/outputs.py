@@ -1,14 +1,26 @@
 import csv
 import datetime as dt
+import json
 import logging
+import sqlite3
+from itertools import islice
 
-from prettytable import PrettyTable
-
-from configs import configure_logging
-from constants import BASE_DIR, DATETIME_FORMAT, DEFAULT, FILE, PRETTY
+from constants import (BASE_DIR, DATETIME_FORMAT, DEFAULT, FILE, JSONL,
+                       OUTPUT_BATCH_SIZE, PARQUET, PRETTY, SQLITE,
+                       SQLITE_RESULTS_FILE)
 
 logger = logging.getLogger(__name__)
-configure_logging(logger)
+
+
+def import_pyarrow():
+    """Возвращает модуль pyarrow или None, если пакет не установлен.
+    Пакет загружается только при выводе в Parquet."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
 
 
 def control_output(results, cli_args):
@@ -17,7 +29,10 @@ def control_output(results, cli_args):
 
 
 def pretty_output(results, *args):
-    """Печатает результат в виде красивой консольной таблицы."""
+    """Печатает результат в виде красивой консольной таблицы.
+    Для расчёта ширины колонок результат собирается целиком."""
+    from prettytable import PrettyTable
+    results = list(results)
     table = PrettyTable()
     # В качестве заголовков устанавливаем первый элемент списка.
     table.field_names = results[0]
@@ -26,8 +41,7 @@ def pretty_output(results, *args):
     print(table)
 
 
-def file_output(results, cli_args):
-    """Печатает результат в файл в формате csv."""
+def get_results_dir():
     results_dir = BASE_DIR / 'results'
     # При попытке переноса этой переменной в constants, не проходят тесты
     # по причине того, что они не видят папку results, которая в ходе тестов
@@ -36,24 +50,127 @@ def file_output(results, cli_args):
     # Почему так происходит я разобраться не смог, но предполагаю, что это
     # как-то связано с оптимизацией при построении байт-кода
     results_dir.mkdir(exist_ok=True)
+    return results_dir
+
+
+def get_results_path(cli_args, extension):
     now_formatted = dt.datetime.now().strftime(DATETIME_FORMAT)
-    filename = f'{cli_args.mode}_{now_formatted}.csv'
-    file_path = results_dir / filename
+    filename = f'{cli_args.mode}_{now_formatted}.{extension}'
+    return get_results_dir() / filename
+
+
+def iter_batches(rows, size=OUTPUT_BATCH_SIZE):
+    rows = iter(rows)
+    batch = list(islice(rows, size))
+    while batch:
+        yield batch
+        batch = list(islice(rows, size))
+
+
+def file_output(results, cli_args):
+    """Печатает результат в файл в формате csv построчно, по мере
+    получения строк."""
+    file_path = get_results_path(cli_args, 'csv')
     with open(file_path, 'w', encoding='UTF-8') as file:
         writer = csv.writer(file, dialect=csv.unix_dialect)
-        writer.writerows(results)
+        for row in results:
+            writer.writerow(row)
+            file.flush()
+
+    logger.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def jsonl_output(results, cli_args):
+    """Сохраняет результат в файл JSON Lines: по объекту на строку, с
+    заголовками результата в качестве ключей."""
+    results = iter(results)
+    header = next(results)
+    file_path = get_results_path(cli_args, 'jsonl')
+    with open(file_path, 'w', encoding='UTF-8') as file:
+        for batch in iter_batches(results):
+            file.writelines(
+                json.dumps(dict(zip(header, row)), ensure_ascii=False) + '\n'
+                for row in batch
+            )
+            file.flush()
+
+    logger.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def get_table_name(cli_args):
+    """Возвращает таблицу результатов режима. Изменения относительно
+    прошлого запуска (--changes) имеют свои колонки и хранятся в отдельной
+    таблице режима."""
+    table = cli_args.mode.replace('-', '_')
+    if getattr(cli_args, 'changes', False):
+        return f'{table}_changes'
+    return table
+
+
+def sqlite_output(results, cli_args):
+    """Добавляет результат в таблицу режима в базе SQLite вместе с временем
+    запуска."""
+    results = iter(results)
+    header = next(results)
+    table = get_table_name(cli_args)
+    columns = ', '.join(f'"{name}"' for name in ('Время запуска', *header))
+    placeholders = ', '.join('?' * (len(header) + 1))
+    run_timestamp = dt.datetime.now().strftime(DATETIME_FORMAT)
+
+    file_path = get_results_dir() / SQLITE_RESULTS_FILE
+    connection = sqlite3.connect(file_path)
+    try:
+        connection.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({columns})')
+        for batch in iter_batches(results):
+            with connection:
+                connection.executemany(
+                    f'INSERT INTO "{table}" ({columns}) '
+                    f'VALUES ({placeholders})',
+                    [(run_timestamp, *row) for row in batch]
+                )
+    finally:
+        connection.close()
+
+    logger.info(f'Результаты добавлены в таблицу {table}: {file_path}')
+
+
+def parquet_output(results, cli_args):
+    """Сохраняет результат в файл Parquet группами строк."""
+    pyarrow = import_pyarrow()
+    if pyarrow is None:
+        raise ImportError('Для вывода в Parquet установите пакет pyarrow')
+    results = iter(results)
+    header = next(results)
+    file_path = get_results_path(cli_args, 'parquet')
+    writer = None
+    try:
+        for batch in iter_batches(results):
+            table = pyarrow.Table.from_pylist(
+                [dict(zip(header, row)) for row in batch],
+                schema=writer.schema if writer else None
+            )
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(file_path,
+                                                       table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
 
     logger.info(f'Файл с результатами был сохранён: {file_path}')
 
 
 def default_output(results, *args):
-    """Печатает результат построчно в консоль."""
+    """Печатает результат построчно в консоль, по мере получения строк."""
     for row in results:
-        print(*row)
+        print(*row, flush=True)
 
 
 OUTPUT_MODE = {
     PRETTY: pretty_output,
     FILE: file_output,
+    JSONL: jsonl_output,
+    SQLITE: sqlite_output,
+    PARQUET: parquet_output,
     DEFAULT: default_output,
 }
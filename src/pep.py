@@ -1,62 +1,283 @@
-import requests_cache
+import hashlib
+import json
+import os
+from array import array
+from collections import Counter
+from itertools import compress
 
-from constants import EXPECTED_STATUS, EXPECTED_TYPE
+from constants import (EXPECTED_STATUS, EXPECTED_TYPE, PEP_JOURNAL_FILE,
+                       PEP_SNAPSHOT_FILE)
 from exceptions import ParserDataConflictException
-from utils import get_soup, select_tag
+from journal import Journal
+from utils import LazyStrainer, get_record, select_tag
+
+# Со страницы PEP нужна только таблица с полями заголовка
+STATUS_STRAINER = LazyStrainer('dl', attrs={'class': 'field-list'})
+
+# Коды ключей и статусов PEP в компактном хранилище. Код 0 у статуса
+# означает, что статус ещё не получен
+TYPE_CODES = {type_key: code for code, type_key in enumerate(EXPECTED_TYPE)}
+STATUS_KEYS = tuple(EXPECTED_STATUS)
+STATUS_KEY_CODES = {key: code for code, key in enumerate(STATUS_KEYS)}
+STATUSES = ('', *dict.fromkeys(
+    status for statuses in EXPECTED_STATUS.values() for status in statuses
+))
+# Пары (код ключа статуса, код статуса), при которых статус PEP совпадает
+# с ключом из общего списка
+EXPECTED_PAIRS = frozenset(
+    (STATUS_KEY_CODES[status_key], STATUSES.index(status))
+    for status_key, statuses in EXPECTED_STATUS.items()
+    for status in statuses
+)
+# Таблица для инвертирования масок из байтов 0 и 1
+MASK_INVERSION = bytes.maketrans(b'\0\1', b'\1\0')
+
+
+def find_status(soup):
+    """Возвращает текст поля Status со страницы PEP или None."""
+    info_table = select_tag(soup, 'dl.field-list')
+
+    for child in info_table.find_all('dt'):
+        if 'Status' in child.strings:
+            status_tag = child.next_sibling.next_sibling
+            break
+    else:
+        status_tag = None
+
+    return status_tag.text if status_tag else None
+
+
+def check_status(link, status_key, status):
+    """Сверяет статус PEP с ключом статуса из общего списка."""
+    if status not in EXPECTED_STATUS[status_key]:
+        message = (
+            f'Несовпадающий статус ({link}); '
+            f'Статус в карточке: {status}; '
+            f'Ожидаемые статусы: {EXPECTED_STATUS[status_key]}'
+        )
+        raise ParserDataConflictException(message)
 
 
 class PythonPEP:
-    """Класс, отображающий сведения о Python Enhancement Proposals"""
+    """Класс, отображающий сведения о Python Enhancement Proposals.
+    Ключи типа и статуса проверяются при добавлении PEP в PEPCollection."""
+    __slots__ = ('number', 'name', 'type_key', 'status_key', 'link', 'status')
+
     def __init__(self,
                  number: int,
                  name: str,
                  type_key: str,
                  status_key: str,
-                 link: str):
-
-        error_message = ''
-        if type_key not in EXPECTED_TYPE:
-            error_message = f'Некорректный ключ типа: {type_key}'
-        if status_key not in EXPECTED_STATUS:
-            error_message = f'Некорректный ключ статуса: {status_key}'
-
-        if error_message:
-            raise ValueError(error_message)
-
+                 link: str,
+                 status: str = ''):
         self.number = number
         self.name = name
         self.type_key = type_key
         self.status_key = status_key
         self.link = link
-        self.status = ''
+        self.status = status
 
     def get_status(self, session=None):
         """Возвращает статус PEP. При его отсутствии, получает его со страницы
          самого PEP"""
         if not session:
-            session = requests_cache.CachedSession()
+            from sessions import get_default_session
+            session = get_default_session()
 
-        soup = get_soup(session, self.link)
-        info_table = select_tag(soup, 'dl.field-list')
+        status = get_record(session, self.link, find_status, STATUS_STRAINER)
+        if status is None:
+            return None
 
-        for child in info_table.find_all('dt'):
-            if 'Status' in child.strings:
-                status_tag = child.next_sibling.next_sibling
-                break
-        else:
-            status_tag = None
+        return self.set_status(status)
 
-        if not status_tag:
+    def parse_status(self, soup):
+        """Извлекает статус PEP из разобранной страницы самого PEP"""
+        status = find_status(soup)
+        if status is None:
             return None
 
-        self.status = status_tag.text
+        return self.set_status(status)
+
+    def set_status(self, status):
+        """Устанавливает статус PEP, полученный из внешнего источника, и
+        сверяет его с ключом статуса из общего списка"""
+        self.status = status
+        check_status(self.link, self.status_key, status)
+        return self.status
+
+
+class PEPCollection:
+    """Компактное хранилище PEP из общего списка.
+
+    Поля PEP хранятся в параллельных массивах, ключи типа и статуса и сами
+    статусы - в виде кодов. Статусы записываются по индексу PEP в общем
+    списке, объекты PythonPEP создаются только при обращении к отдельным
+    PEP, а сводки по всему списку считаются по массивам кодов.
+    """
+    def __init__(self):
+        self.numbers = array('I')
+        self.names = []
+        self.links = []
+        self.type_codes = array('B')
+        self.status_key_codes = array('B')
+        self.status_codes = array('H')
+        self.status_names = list(STATUSES)
+        self._status_index = {
+            status: code for code, status in enumerate(STATUSES)
+        }
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Создаёт хранилище из строк общего списка PEP вида
+        (ключи типа и статуса, номер, название, ссылка)."""
+        collection = cls()
+        for keys, number, name, link in rows:
+            collection.append(int(number), name, keys[:1], keys[1:], link)
+        return collection
+
+    def append(self, number, name, type_key, status_key, link):
+        if type_key not in TYPE_CODES:
+            raise ValueError(f'Некорректный ключ типа: {type_key}')
+        if status_key not in STATUS_KEY_CODES:
+            raise ValueError(f'Некорректный ключ статуса: {status_key}')
+
+        self.numbers.append(number)
+        self.names.append(name)
+        self.links.append(link)
+        self.type_codes.append(TYPE_CODES[type_key])
+        self.status_key_codes.append(STATUS_KEY_CODES[status_key])
+        self.status_codes.append(0)
 
-        if self.status not in EXPECTED_STATUS[self.status_key]:
-            message = (
-                f'Несовпадающий статус ({self.link}); '
-                f'Статус в карточке: {self.status}; '
-                f'Ожидаемые статусы: {EXPECTED_STATUS[self.status_key]}'
+    def get_status_code(self, status):
+        """Возвращает код статуса, добавляя неизвестный статус в таблицу."""
+        code = self._status_index.get(status)
+        if code is None:
+            code = self._status_index[status] = len(self.status_names)
+            self.status_names.append(status)
+        return code
+
+    def set_statuses(self, statuses):
+        """Записывает статусы PEP в порядке общего списка."""
+        self.status_codes = array('H', map(self.get_status_code, statuses))
+
+    def set_status(self, index, status):
+        """Записывает статус PEP с индексом index и сверяет его с ключом
+        статуса из общего списка. Несовпадающий статус тоже записывается."""
+        self.status_codes[index] = self.get_status_code(status)
+        check_status(self.links[index],
+                     STATUS_KEYS[self.status_key_codes[index]], status)
+        return status
+
+    def get_status(self, index):
+        """Возвращает статус PEP с индексом index ('' - не получен)."""
+        return self.status_names[self.status_codes[index]]
+
+    def get_key_rows(self):
+        """Возвращает строки (номер, ключ типа, ключ статуса, ссылка)."""
+        return [
+            (number, EXPECTED_TYPE[type_code], STATUS_KEYS[status_key_code],
+             link)
+            for number, type_code, status_key_code, link in zip(
+                self.numbers, self.type_codes, self.status_key_codes,
+                self.links,
             )
-            raise ParserDataConflictException(message)
+        ]
 
-        return self.status
+    def __len__(self):
+        return len(self.numbers)
+
+    def __getitem__(self, index):
+        return PythonPEP(self.numbers[index], self.names[index],
+                         EXPECTED_TYPE[self.type_codes[index]],
+                         STATUS_KEYS[self.status_key_codes[index]],
+                         self.links[index],
+                         self.status_names[self.status_codes[index]])
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self)))
+
+    def expected_mask(self):
+        """Возвращает по байту на PEP: 1, если статус совпадает с ключом
+        статуса из общего списка, иначе 0."""
+        return bytes(map(EXPECTED_PAIRS.__contains__,
+                         zip(self.status_key_codes, self.status_codes)))
+
+    def count_by_status(self):
+        """Возвращает количество PEP по статусам, совпадающим с ключами
+        общего списка, в порядке первого появления статуса."""
+        counts = Counter(compress(self.status_codes, self.expected_mask()))
+        return {self.status_names[code]: count
+                for code, count in counts.items()}
+
+    def count_by_type(self):
+        """Возвращает количество PEP по парам (ключ типа, статус)."""
+        counts = Counter(zip(self.type_codes, self.status_codes))
+        return {
+            (EXPECTED_TYPE[type_code], self.status_names[status_code]): count
+            for (type_code, status_code), count in counts.items()
+        }
+
+    def mismatches(self):
+        """Возвращает PEP, статус которых не совпадает с ключом статуса из
+        общего списка или не получен."""
+        mask = self.expected_mask().translate(MASK_INVERSION)
+        return list(map(self.__getitem__, compress(range(len(self)), mask)))
+
+
+def load_snapshot(path=None):
+    """Возвращает снимок прошлого запуска {номер: поля PEP}."""
+    path = path or PEP_SNAPSHOT_FILE
+    try:
+        with open(path, encoding='UTF-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        return {}
+
+
+def save_snapshot(peps, path=None):
+    """Сохраняет ключи из общего списка и статусы PEP, совпавшие с ними."""
+    path = path or PEP_SNAPSHOT_FILE
+    snapshot = {}
+    for index, (number, type_key, status_key, _) in enumerate(
+            peps.get_key_rows()):
+        status = peps.get_status(index)
+        if status in EXPECTED_STATUS[status_key]:
+            snapshot[str(number)] = {
+                'type_key': type_key, 'status_key': status_key,
+                'status': status,
+            }
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='UTF-8') as file:
+        json.dump(snapshot, file, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def get_snapshot_status(key_row, snapshot):
+    """Возвращает статус PEP из снимка, если его строка
+    (номер, ключ типа, ключ статуса, ссылка) в общем списке не изменилась."""
+    number, type_key, status_key, _ = key_row
+    fields = snapshot.get(str(number))
+    if (fields and fields['type_key'] == type_key
+            and fields['status_key'] == status_key):
+        return fields['status']
+    return None
+
+
+def get_journal_path(cli_args):
+    """Возвращает путь журнала статусов: --journal, при --resume без него -
+    путь по умолчанию, иначе None (журнал ведётся только в памяти)."""
+    path = getattr(cli_args, 'journal', None)
+    if path is None and getattr(cli_args, 'resume', False):
+        return PEP_JOURNAL_FILE
+    return path
+
+
+def open_journal(peps, resume=False, path=None):
+    """Открывает журнал статусов запуска. Журнал прерванного запуска
+    продолжается, только если общий список PEP не изменился. Без пути
+    журнал на диск не записывается."""
+    rows = peps.get_key_rows()
+    key = hashlib.sha1(json.dumps(rows).encode('UTF-8')).hexdigest()
+    return Journal.open(path, key, resume)
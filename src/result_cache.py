@@ -0,0 +1,79 @@
+import json
+import sqlite3
+import threading
+import time
+
+from constants import DEFAULT_RESULT_CACHE_SIZE, RESULT_CACHE_FILE
+
+
+class ResultCache:
+    """Хранилище данных, извлечённых из страниц.
+
+    Запись ищется по ключу (тип записи, URL) и считается действительной,
+    только пока совпадает отпечаток ответа (ETag или хеш содержимого).
+    При превышении max_size байт удаляются самые старые записи.
+    """
+    def __init__(self, path=RESULT_CACHE_FILE,
+                 max_size=DEFAULT_RESULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path),
+                                           check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS records ('
+            'kind TEXT, url TEXT, fingerprint TEXT, value TEXT, '
+            'size INTEGER, created REAL, PRIMARY KEY (kind, url))'
+        )
+        self._size = self._connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM records'
+        ).fetchone()[0]
+
+    def get(self, kind, url, fingerprint):
+        """Возвращает пару (найдена ли запись, запись)."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value FROM records '
+                'WHERE kind = ? AND url = ? AND fingerprint = ?',
+                (kind, url, fingerprint)
+            ).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0])
+
+    def set(self, kind, url, fingerprint, record):
+        value = json.dumps(record, ensure_ascii=False)
+        with self._lock, self._connection:
+            old = self._connection.execute(
+                'SELECT size FROM records WHERE kind = ? AND url = ?',
+                (kind, url)
+            ).fetchone()
+            self._connection.execute(
+                'INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)',
+                (kind, url, fingerprint, value, len(value), time.time())
+            )
+            self._size += len(value) - (old[0] if old else 0)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        rows = self._connection.execute(
+            'SELECT kind, url, size FROM records ORDER BY created'
+        ).fetchall()
+        for kind, url, size in rows:
+            if self._size <= self.max_size:
+                break
+            self._connection.execute(
+                'DELETE FROM records WHERE kind = ? AND url = ?', (kind, url)
+            )
+            self._size -= size
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM records')
+            self._size = 0
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,208 @@
+import datetime as dt
+import hashlib
+import json
+import logging
+import sys
+import threading
+from argparse import Namespace
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from configs import (configure_argument_parser, configure_logging,
+                     positive_int)
+from constants import (ALL_MODES, DATETIME_FORMAT, DEFAULT_SERVE_INTERVAL,
+                       DEFAULT_SERVE_PORT, SERVE_HOST)
+from metrics import metrics
+
+# Режимы, результаты которых отдаёт сервер; download результата не имеет
+SERVE_MODES = ('whats-new', 'latest-versions', 'pep')
+
+logger = logging.getLogger(__name__)
+
+
+class ResultStore:
+    """Последние результаты режимов, подготовленные для отдачи по HTTP:
+    тело ответа в JSON и его ETag считаются один раз при обновлении."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}
+
+    def set(self, mode, rows):
+        """Сохраняет результат режима. ETag зависит только от строк
+        результата, поэтому не меняется при обновлении без изменений;
+        время последнего изменения отдаётся в заголовке Last-Modified."""
+        header, *rows = rows
+        now = dt.datetime.now(dt.timezone.utc)
+        body = json.dumps(
+            {'mode': mode, 'header': header, 'rows': rows},
+            ensure_ascii=False
+        ).encode('utf-8')
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        with self._lock:
+            previous = self._results.get(mode)
+            modified = (previous['modified']
+                        if previous and previous['etag'] == etag else now)
+            self._results[mode] = {
+                'updated': now.astimezone().strftime(DATETIME_FORMAT),
+                'modified': modified, 'etag': etag, 'body': body,
+                'error': None,
+            }
+
+    def set_error(self, mode, error):
+        """Сохраняет ошибку обновления, оставляя прежний результат."""
+        with self._lock:
+            result = self._results.setdefault(
+                mode, {'updated': None, 'modified': None, 'etag': None,
+                       'body': None}
+            )
+            result['error'] = str(error)
+
+    def get(self, mode):
+        with self._lock:
+            return self._results.get(mode)
+
+    def summary(self):
+        with self._lock:
+            return {
+                mode: {key: value for key, value in result.items()
+                       if key not in ('body', 'modified')}
+                for mode, result in self._results.items()
+            }
+
+
+def refresh(session, cli_args, store, modes):
+    """Выполняет режимы и обновляет их результаты в хранилище."""
+    import main
+
+    for mode in modes:
+        mode_args = Namespace(**{**vars(cli_args), 'mode': mode})
+        try:
+            store.set(mode, main.get_mode_function(mode)(session, mode_args))
+        except Exception as ex:
+            metrics.count_error(ex)
+            store.set_error(mode, ex)
+            logger.error(f'Ошибка обновления режима {mode}: {ex}')
+        else:
+            logger.info(f'Результаты режима {mode} обновлены.')
+
+
+def run_refresh_loop(session, cli_args, store, modes, stop_event):
+    """Обновляет результаты сразу и затем каждые cli_args.interval секунд,
+    пока не установлен stop_event."""
+    while True:
+        refresh(session, cli_args, store, modes)
+        if stop_event.wait(cli_args.interval):
+            return
+
+
+class ResultRequestHandler(BaseHTTPRequestHandler):
+    """Отдаёт результаты режимов: / - сводка по режимам, /<режим> -
+    результат режима с ETag, /metrics - метрики в формате Prometheus."""
+    def do_GET(self):
+        path = self.path.split('?')[0].strip('/')
+        if not path:
+            self.send_json(self.server.store.summary())
+        elif path == 'metrics':
+            self.send_body(metrics.to_prometheus().encode('utf-8'),
+                           'text/plain; version=0.0.4')
+        else:
+            self.send_result(path)
+
+    def send_result(self, mode):
+        result = self.server.store.get(mode)
+        if result is None or result['body'] is None:
+            self.send_json({'error': f'Нет результатов режима {mode}'},
+                           HTTPStatus.NOT_FOUND)
+            return
+        last_modified = formatdate(result['modified'].timestamp(),
+                                   usegmt=True)
+        if self.headers.get('If-None-Match') == result['etag']:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', result['etag'])
+            self.send_header('Last-Modified', last_modified)
+            self.end_headers()
+            return
+        self.send_body(result['body'], 'application/json; charset=utf-8',
+                       result['etag'], last_modified=last_modified)
+
+    def send_json(self, data, status=HTTPStatus.OK):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_body(body, 'application/json; charset=utf-8', status=status)
+
+    def send_body(self, body, content_type, etag=None, status=HTTPStatus.OK,
+                  last_modified=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        if last_modified:
+            self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class ResultServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, store):
+        super().__init__(address, ResultRequestHandler)
+        self.store = store
+
+
+def configure_server_parser():
+    parser = configure_argument_parser([*SERVE_MODES, ALL_MODES])
+    parser.description = ('Сервер с результатами режимов парсера, '
+                          'обновляемыми в фоне')
+    parser.add_argument('--host', default=SERVE_HOST,
+                        help='Адрес, на котором принимаются запросы')
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVE_PORT,
+                        help='Порт, на котором принимаются запросы')
+    parser.add_argument('--interval', type=positive_int,
+                        default=DEFAULT_SERVE_INTERVAL,
+                        help='Период обновления результатов, с')
+    return parser
+
+
+def serve():
+    configure_logging(logger)
+    configure_logging(logging.getLogger('main'))
+    configure_logging(logging.getLogger('crawler'))
+    args = configure_server_parser().parse_args()
+    modes = (list(SERVE_MODES) if ALL_MODES in args.mode
+             else list(dict.fromkeys(args.mode)))
+
+    from sessions import create_session
+    from soup_cache import soup_cache
+    soup_cache.configure(args.soup_cache_size)
+    session = create_session(args)
+    store = ResultStore()
+    stop_event = threading.Event()
+    refresher = threading.Thread(
+        target=run_refresh_loop,
+        args=(session, args, store, modes, stop_event),
+        daemon=True,
+    )
+    refresher.start()
+
+    server = ResultServer((args.host, args.port), store)
+    logger.info(f'Сервер запущен: http://{args.host}:{server.server_port}/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_event.set()
+        server.server_close()
+        if hasattr(session, 'parse_pool'):
+            session.parse_pool.shutdown(wait=False, cancel_futures=True)
+    logger.info('Сервер остановлен.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(serve())
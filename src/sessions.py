@@ -0,0 +1,221 @@
+import multiprocessing
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import requests_cache
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests_cache.response import set_response_defaults
+
+from constants import (DEFAULT_BACKOFF, DEFAULT_DOCS_TTL,
+                       DEFAULT_PARSE_WORKERS, DEFAULT_PEP_INDEX_TTL,
+                       DEFAULT_PEP_TTL, DEFAULT_POOL_SIZE, DEFAULT_RATE_BURST,
+                       DEFAULT_RATE_LIMIT, DEFAULT_RETRIES, DEFAULT_WORKERS,
+                       DOCS_URL_PATTERN, PEP_INDEX_URL_PATTERN,
+                       PEP_PAGE_URL_PATTERN, REQUEST_TIMEOUT)
+from result_cache import ResultCache
+from throttling import HostRateLimiter, RetryPolicy
+from utils import clone_session
+
+NOT_MODIFIED = 304
+
+cache_stats_message = (
+    'Статистика кеша: запросов {requests}, из кеша {hits}, '
+    'подтверждено сервером (304) {revalidated}, загружено {downloaded}'
+)
+
+
+class CacheStats:
+    """Потокобезопасные счётчики обращений к кешу HTTP-ответов."""
+    def __init__(self):
+        self._counter = Counter()
+        self._lock = threading.Lock()
+
+    def increment(self, name):
+        with self._lock:
+            self._counter[name] += 1
+
+    def as_dict(self):
+        with self._lock:
+            requests = self._counter['requests']
+            revalidated = self._counter['revalidated']
+            downloaded = self._counter['downloaded']
+        return {
+            'requests': requests,
+            'hits': requests - revalidated - downloaded,
+            'revalidated': revalidated,
+            'downloaded': downloaded,
+        }
+
+    def __str__(self):
+        return cache_stats_message.format(**self.as_dict())
+
+
+class ParserCachedSession(requests_cache.CachedSession):
+    """Сессия с кешем, которая перед повторной загрузкой устаревшего ответа
+    отправляет условный запрос (If-None-Match/If-Modified-Since). При ответе
+    304 сохранённый ответ продлевается без загрузки тела страницы."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = CacheStats()
+
+    def send(self, request, **kwargs):
+        if self._is_cacheable(request):
+            self.stats.increment('requests')
+        return super().send(request, **kwargs)
+
+    def _send_and_cache(self, request, cache_key, **kwargs):
+        self.stats.increment('downloaded')
+        return super()._send_and_cache(request, cache_key, **kwargs)
+
+    def _handle_expired_response(self, request, response, cache_key,
+                                 **kwargs):
+        validators = get_validators(response)
+        if not validators:
+            return super()._handle_expired_response(
+                request, response, cache_key, **kwargs
+            )
+
+        conditional_request = request.copy()
+        conditional_request.headers.update(validators)
+        try:
+            new_response = Session.send(self, conditional_request, **kwargs)
+        except Exception:
+            if self.old_data_on_error:
+                return response
+            self.cache.delete(cache_key)
+            raise
+
+        expire_after = self._get_expiration(request.url)
+        if new_response.status_code == NOT_MODIFIED:
+            self.stats.increment('revalidated')
+            # Срок хранения отсчитывается от created_at, поэтому ответ,
+            # подтверждённый сервером, считается полученным заново
+            response.created_at = datetime.utcnow()
+            response.revalidate(expire_after)
+            self.cache.responses[cache_key] = response
+            return response
+
+        self.stats.increment('downloaded')
+        if new_response.status_code in self.allowable_codes:
+            self.cache.save_response(cache_key, new_response, expire_after)
+        return set_response_defaults(new_response)
+
+
+def get_validators(response):
+    """Возвращает заголовки условного запроса для сохранённого ответа."""
+    validators = {}
+    if response.headers.get('ETag'):
+        validators['If-None-Match'] = response.headers['ETag']
+    if response.headers.get('Last-Modified'):
+        validators['If-Modified-Since'] = response.headers['Last-Modified']
+    return validators
+
+
+def get_urls_expire_after(cli_args=None):
+    """Возвращает время жизни кеша для шаблонов URL. Шаблоны проверяются
+    по порядку, поэтому страницы PEP идут раньше общего шаблона сайта PEP."""
+    return {
+        PEP_PAGE_URL_PATTERN: getattr(cli_args, 'pep_ttl', DEFAULT_PEP_TTL),
+        PEP_INDEX_URL_PATTERN: getattr(cli_args, 'pep_index_ttl',
+                                       DEFAULT_PEP_INDEX_TTL),
+        DOCS_URL_PATTERN: getattr(cli_args, 'docs_ttl', DEFAULT_DOCS_TTL),
+    }
+
+
+class PooledAdapter(HTTPAdapter):
+    """Транспорт requests с пулом соединений, рассчитанным на число
+    параллельных загрузок, и тайм-аутом для запросов без своего тайм-аута.
+    Если передан ограничитель частоты, запросы к хосту ждут его маркеров;
+    ответы из кеша до транспорта не доходят и ограничением не учитываются.
+    """
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=REQUEST_TIMEOUT,
+                 rate_limiter=None):
+        super().__init__(pool_maxsize=pool_size)
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        if self.rate_limiter is not None:
+            self.rate_limiter.wait(request.url)
+        return super().send(request, **kwargs)
+
+
+def create_parse_pool(workers):
+    """Создаёт пул процессов для разбора страниц. Процессы запускаются
+    заново (spawn), а не копируются из процесса с работающими потоками
+    загрузки."""
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+    )
+
+
+def create_session(cli_args=None, pool_size=None, **kwargs):
+    """Создаёт сессию парсера. Все запросы, включая копии сессии для
+    потоков и загрузку архива, идут через её пул соединений.
+
+    pool_size - число одновременных запросов, по умолчанию - количество
+    потоков загрузки из аргументов командной строки.
+
+    При запуске по снимку (--from-snapshot) страницы берутся из снимка, а
+    кеш HTTP-ответов хранится только в памяти, чтобы страницы снимка и
+    сайта не смешивались.
+    """
+    snapshot_path = getattr(cli_args, 'from_snapshot', None)
+    if snapshot_path:
+        kwargs.setdefault('backend', 'memory')
+    session = ParserCachedSession(
+        urls_expire_after=get_urls_expire_after(cli_args), **kwargs
+    )
+    session.retry_policy = RetryPolicy(
+        getattr(cli_args, 'retries', DEFAULT_RETRIES),
+        getattr(cli_args, 'backoff', DEFAULT_BACKOFF),
+    )
+    rate_limit = getattr(cli_args, 'rate_limit', DEFAULT_RATE_LIMIT)
+    if rate_limit:
+        session.rate_limiter = HostRateLimiter(
+            rate_limit, getattr(cli_args, 'rate_burst', DEFAULT_RATE_BURST)
+        )
+    pool_size = pool_size or getattr(cli_args, 'workers', DEFAULT_WORKERS)
+    adapter = PooledAdapter(
+        max(pool_size, DEFAULT_POOL_SIZE), REQUEST_TIMEOUT,
+        getattr(session, 'rate_limiter', None),
+    )
+    if snapshot_path:
+        from snapshots import SnapshotAdapter, SnapshotReader
+        session.retry_policy = RetryPolicy(retries=0)
+        adapter = SnapshotAdapter(SnapshotReader(snapshot_path))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    parse_workers = getattr(cli_args, 'parse_workers', DEFAULT_PARSE_WORKERS)
+    if parse_workers:
+        session.parse_pool = create_parse_pool(parse_workers)
+    if not getattr(cli_args, 'no_result_cache', False):
+        session.result_cache = ResultCache()
+    if getattr(cli_args, 'clear_cache', False):
+        session.cache.clear()
+        if hasattr(session, 'result_cache'):
+            session.result_cache.clear()
+    return session
+
+
+_default_session = None
+_default_session_lock = threading.Lock()
+_thread_sessions = threading.local()
+
+
+def get_default_session():
+    """Возвращает сессию для вызовов, которым сессия не передана. Сессия
+    создаётся один раз за запуск; каждый поток получает её копию с общими
+    кешем и пулом соединений."""
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = create_session()
+    if getattr(_thread_sessions, 'session', None) is None:
+        _thread_sessions.session = clone_session(_default_session)
+    return _thread_sessions.session
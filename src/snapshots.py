@@ -0,0 +1,176 @@
+import argparse
+import datetime as dt
+import json
+import mmap
+import struct
+import sys
+import threading
+import time
+import zipfile
+import zlib
+from argparse import Namespace
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from constants import DATETIME_FORMAT
+
+SNAPSHOT_MODES = ('whats-new', 'latest-versions', 'pep')
+SNAPSHOT_INDEX = 'index.json'
+SAVED_HEADERS = ('content-type', 'etag', 'last-modified', 'location')
+# Заголовок файла в zip: подпись, ..., длины имени и доп. поля (смещение 26)
+LOCAL_HEADER = struct.Struct('<4s22xHH')
+
+missing_page_error = 'Страница {url} отсутствует в снимке {path}'
+
+
+class SnapshotWriter:
+    """Сохраняет ответы в сжатый zip-архив с индексом {URL: запись}.
+    Повторные ответы для того же URL не сохраняются."""
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        self._archive = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        self._lock = threading.Lock()
+
+    def add(self, response, *args, **kwargs):
+        url = response.request.url
+        with self._lock:
+            if url in self.pages:
+                return
+            filename = f'pages/{len(self.pages):05}'
+            self._archive.writestr(filename, response.content)
+            self.pages[url] = {
+                'file': filename,
+                'status': response.status_code,
+                'headers': {
+                    key: value for key, value in response.headers.items()
+                    if key.lower() in SAVED_HEADERS
+                },
+            }
+
+    def close(self, modes=()):
+        index = {
+            'created': dt.datetime.now().strftime(DATETIME_FORMAT),
+            'modes': list(modes),
+            'pages': self.pages,
+        }
+        with self._lock:
+            self._archive.writestr(SNAPSHOT_INDEX,
+                                   json.dumps(index, ensure_ascii=False))
+            self._archive.close()
+
+
+class SnapshotReader:
+    """Читает страницы из снимка через mmap.
+
+    При открытии читается только индекс архива; тело страницы берётся из
+    отображённого в память файла по смещению и распаковывается отдельно,
+    поэтому чтение из нескольких потоков не требует блокировок.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            with zipfile.ZipFile(file) as archive:
+                self._members = {
+                    info.filename: self.get_member(info)
+                    for info in archive.infolist()
+                }
+                index = json.loads(archive.read(SNAPSHOT_INDEX))
+        self.created = index['created']
+        self.modes = index['modes']
+        self.pages = index['pages']
+
+    def get_member(self, info):
+        """Возвращает (смещение данных, размер, способ сжатия) файла."""
+        _, name_length, extra_length = LOCAL_HEADER.unpack_from(
+            self._mmap, info.header_offset
+        )
+        offset = (info.header_offset + LOCAL_HEADER.size + name_length
+                  + extra_length)
+        return offset, info.compress_size, info.compress_type
+
+    def read(self, filename):
+        offset, size, compress_type = self._members[filename]
+        data = self._mmap[offset:offset + size]
+        if compress_type == zipfile.ZIP_DEFLATED:
+            return zlib.decompress(data, -zlib.MAX_WBITS)
+        return data
+
+    def close(self):
+        self._mmap.close()
+
+
+class SnapshotAdapter(BaseAdapter):
+    """Транспорт requests, отдающий страницы из снимка вместо сети.
+    Учитывает количество отданных страниц и время их получения."""
+    def __init__(self, reader):
+        super().__init__()
+        self.reader = reader
+        self.pages = 0
+        self.io_time = 0
+
+    def send(self, request, **kwargs):
+        started = time.perf_counter()
+        page = self.reader.pages.get(request.url)
+        if page is None:
+            raise requests.ConnectionError(missing_page_error.format(
+                url=request.url, path=self.reader.path
+            ))
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        response.status_code = page['status']
+        response.headers = CaseInsensitiveDict(page['headers'])
+        response._content = self.reader.read(page['file'])
+        self.pages += 1
+        self.io_time += time.perf_counter() - started
+        return response
+
+    def close(self):
+        pass
+
+
+def record(path, modes=SNAPSHOT_MODES, session=None):
+    """Выполняет режимы и сохраняет все полученные ими страницы в снимок.
+    Возвращает количество сохранённых страниц."""
+    import main
+    from sessions import create_session
+
+    if session is None:
+        session = create_session(Namespace(no_result_cache=True),
+                                 backend='memory')
+    writer = SnapshotWriter(path)
+    session.hooks['response'].append(writer.add)
+    try:
+        for mode in modes:
+            main.get_mode_function(mode)(session)
+    finally:
+        session.hooks['response'].remove(writer.add)
+        writer.close(modes)
+    return len(writer.pages)
+
+
+def configure_snapshot_parser():
+    parser = argparse.ArgumentParser(
+        description='Сохранение страниц, которые посещают режимы парсера, '
+                    'в снимок для запуска без сети'
+    )
+    parser.add_argument('path', help='Файл снимка (zip)')
+    parser.add_argument('--modes', nargs='+', choices=SNAPSHOT_MODES,
+                        default=SNAPSHOT_MODES,
+                        help='Режимы, страницы которых сохраняются')
+    return parser
+
+
+def snapshot():
+    args = configure_snapshot_parser().parse_args()
+    pages = record(args.path, args.modes)
+    print(f'Сохранено страниц: {pages}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(snapshot())
@@ -0,0 +1,59 @@
+import threading
+from collections import OrderedDict
+
+from constants import DEFAULT_SOUP_CACHE_SIZE, SOUP_SIZE_FACTOR
+
+
+class SoupCache:
+    """LRU-кеш разобранных страниц, общий для всех вызовов get_soup.
+
+    Ключом служит URL, отпечаток ответа и фильтр SoupStrainer, с которым
+    строилось дерево. Размер дерева оценивается по длине текста страницы;
+    при превышении max_size байт удаляются давно не использованные деревья.
+    Деревья из кеша отдаются без копирования и не должны изменяться.
+    """
+    def __init__(self, max_size=DEFAULT_SOUP_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        self._size = 0
+
+    @property
+    def enabled(self):
+        """Включён ли кеш. Если нет, отпечаток страницы не нужен и его
+        вычисление можно пропустить."""
+        return self.max_size > 0
+
+    def get_or_parse(self, url, fingerprint, parse_only, text, parse):
+        """Возвращает дерево из кеша или результат parse(text)."""
+        if not self.enabled:
+            return parse(text)
+
+        key = (url, fingerprint, parse_only)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key][0]
+
+        soup = parse(text)
+        size = len(text) * SOUP_SIZE_FACTOR
+        with self._lock:
+            if key not in self._items and size <= self.max_size:
+                self._items[key] = (soup, size)
+                self._size += size
+                while self._size > self.max_size:
+                    _, (_, evicted_size) = self._items.popitem(last=False)
+                    self._size -= evicted_size
+        return soup
+
+    def configure(self, max_size):
+        with self._lock:
+            self.max_size = max_size
+            self._items.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._items)
+
+
+soup_cache = SoupCache()
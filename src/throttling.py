@@ -0,0 +1,110 @@
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from constants import (DEFAULT_BACKOFF, DEFAULT_RATE_BURST, DEFAULT_RETRIES,
+                       MAX_BACKOFF, RETRY_STATUSES)
+
+
+def get_retry_after(response):
+    """Возвращает задержку из заголовка Retry-After в секундах или None.
+    Заголовок может содержать число секунд или дату HTTP."""
+    if response is None:
+        return None
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0)
+
+
+class RetryPolicy:
+    """Параметры повторных запросов при сбоях соединения и временных
+    ошибках сервера (RETRY_STATUSES).
+
+    Задержка перед повтором растёт экспоненциально и выбирается случайно
+    от нуля до backoff * 2 ** attempt, чтобы параллельные загрузки не
+    повторяли запросы одновременно. Задержка из Retry-After имеет
+    приоритет. Все задержки ограничены max_delay.
+    """
+    def __init__(self, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                 max_delay=MAX_BACKOFF):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+
+    def should_retry(self, attempt, response=None):
+        return attempt < self.retries and (
+            response is None or response.status_code in RETRY_STATUSES
+        )
+
+    def get_delay(self, attempt, response=None):
+        retry_after = get_retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(
+            0, min(self.backoff * 2 ** attempt, self.max_delay)
+        )
+
+
+class TokenBucket:
+    """Потокобезопасное ведро маркеров: rate запросов в секунду с
+    допустимым всплеском до burst запросов."""
+    def __init__(self, rate, burst=DEFAULT_RATE_BURST, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Забирает маркер и возвращает время ожидания до его появления, с.
+        Маркеры резервируются заранее, поэтому параллельные запросы
+        получают разное время ожидания."""
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            return max(-self.tokens / self.rate, 0)
+
+    def pause(self, seconds):
+        """Откладывает следующий запрос не менее чем на seconds секунд."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class HostRateLimiter:
+    """Ограничитель частоты запросов с отдельным ведром маркеров на
+    каждый хост."""
+    def __init__(self, rate, burst=DEFAULT_RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get_bucket(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def wait(self, url):
+        time.sleep(self.get_bucket(url).reserve())
+
+    def pause(self, url, seconds):
+        self.get_bucket(url).pause(seconds)
@@ -1,27 +1,159 @@
-from bs4 import BeautifulSoup
-from requests import RequestException
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from exceptions import ParserConnectionFailedException, ParserFindTagException
+from metrics import metrics
+from soup_cache import soup_cache
 
 connection_error = 'Возникла ошибка при загрузке страницы ({link})'
 find_tag_error = 'Не найден тег {tag} {attrs}'
 select_tag_error = 'Не найден тег {selector}'
 
 
+class LazyStrainer:
+    """Описание части страницы, по которой строится дерево тегов.
+    SoupStrainer создаётся при первом разборе страницы, чтобы модули с
+    такими описаниями не загружали bs4 при запуске парсера."""
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        self._strainer = None
+
+    def __getstate__(self):
+        # В процессы-обработчики передаётся только описание
+        return {**self.__dict__, '_strainer': None}
+
+    def get(self):
+        if self._strainer is None:
+            from bs4 import SoupStrainer
+            self._strainer = SoupStrainer(*self.args, **self.kwargs)
+        return self._strainer
+
+
+def get_strainer(parse_only):
+    """Возвращает SoupStrainer для аргумента parse_only при разборе."""
+    if isinstance(parse_only, LazyStrainer):
+        return parse_only.get()
+    return parse_only
+
+
 def get_response(session, url):
-    try:
-        response = session.get(url)
-        response.encoding = 'utf-8'
-        return response
-    except RequestException:
+    """Загружает страницу. Если к сессии подключены параметры повторов
+    (session.retry_policy), то при сбое соединения или временной ошибке
+    сервера запрос повторяется с нарастающей задержкой."""
+    from requests import RequestException
+
+    retry_policy = getattr(session, 'retry_policy', None)
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            response = session.get(url)
+        except RequestException:
+            response = None
+        if not (retry_policy and retry_policy.should_retry(attempt,
+                                                           response)):
+            break
+        delay = retry_policy.get_delay(attempt, response)
+        rate_limiter = getattr(session, 'rate_limiter', None)
+        if rate_limiter is not None and response is not None:
+            # Сервер просит снизить частоту запросов всех потоков к хосту
+            rate_limiter.pause(url, delay)
+        metrics.increment('retries')
+        time.sleep(delay)
+        attempt += 1
+
+    if response is None:
         raise ParserConnectionFailedException(
             connection_error.format(link=url)
         )
+    response.encoding = 'utf-8'
+    metrics.record_response(url, response, time.perf_counter() - started)
+    return response
+
 
+def make_soup(response, parse_only=None):
+    """Возвращает дерево страницы из общего кеша разобранных страниц или
+    строит его заново."""
+    def parse(text):
+        from bs4 import BeautifulSoup
+        with metrics.timer('parse', response.url):
+            return BeautifulSoup(text, features='lxml',
+                                 parse_only=get_strainer(parse_only))
 
-def get_soup(session, url):
+    if not soup_cache.enabled:
+        return parse(response.text)
+    return soup_cache.get_or_parse(response.url, get_fingerprint(response),
+                                   parse_only, response.text, parse)
+
+
+def get_soup(session, url, parse_only=None):
+    """Возвращает разобранную страницу. При передаче SoupStrainer в
+    parse_only дерево строится только для подходящих под него тегов."""
+    return make_soup(get_response(session, url), parse_only)
+
+
+def get_fingerprint(response):
+    """Возвращает отпечаток содержимого ответа: ETag или хеш тела."""
+    return (response.headers.get('ETag')
+            or hashlib.sha1(response.content).hexdigest())
+
+
+def get_record(session, url, extract, parse_only=None):
+    """Возвращает данные, извлечённые функцией extract(soup) со страницы.
+
+    Если к сессии подключён кеш результатов (session.result_cache), то для
+    не изменившейся страницы разбор HTML не выполняется. Данные должны
+    сериализоваться в JSON.
+
+    Если к сессии подключён пул процессов (session.parse_pool), то разбор
+    выполняется в нём, а поток загрузки получает обратно только данные.
+    Функция extract в этом случае должна быть определена на уровне модуля.
+    """
     response = get_response(session, url)
-    return BeautifulSoup(response.text, features='lxml')
+    result_cache = getattr(session, 'result_cache', None)
+    if result_cache is None:
+        return extract_record(session, response, extract, parse_only)
+
+    # Объекты-извлекатели без имени функции задают тип записи сами
+    kind = getattr(extract, 'kind', None) or extract.__qualname__
+    fingerprint = get_fingerprint(response)
+    found, record = result_cache.get(kind, url, fingerprint)
+    if found:
+        metrics.increment('result_cache_hits')
+    else:
+        record = extract_record(session, response, extract, parse_only)
+        result_cache.set(kind, url, fingerprint, record)
+    return record
+
+
+def extract_record(session, response, extract, parse_only=None):
+    parse_pool = getattr(session, 'parse_pool', None)
+    if parse_pool is not None:
+        record, seconds = parse_pool.submit(
+            parse_record, response.content, response.encoding, extract,
+            parse_only
+        ).result()
+        metrics.add_time('parse', response.url, seconds)
+        return record
+
+    soup = make_soup(response, parse_only)
+    with metrics.timer('select', response.url):
+        return extract(soup)
+
+
+def parse_record(content, encoding, extract, parse_only=None):
+    """Разбирает тело ответа и возвращает извлечённые данные вместе со
+    временем обработки. Выполняется в процессе-обработчике, поэтому дерево
+    тегов в вызывающий процесс не передаётся."""
+    from bs4 import BeautifulSoup
+
+    started = time.perf_counter()
+    soup = BeautifulSoup(content, features='lxml', from_encoding=encoding,
+                         parse_only=get_strainer(parse_only))
+    return extract(soup), time.perf_counter() - started
 
 
 def find_tag(soup, tag, attrs=None, recursive=True):
@@ -42,3 +174,58 @@ def select_tag(soup, selector):
             select_tag_error.format(selector=selector)
         )
     return searched_tag
+
+
+def clone_session(session):
+    """Создаёт новую сессию с общим для исходной сессии хранилищем кеша.
+
+    Сессия requests не является потокобезопасной, поэтому каждый поток
+    получает собственную копию. Бэкенды requests_cache защищают доступ к
+    хранилищу блокировкой, поэтому кеш между копиями разделяется. Копия
+    сессии без кеша (requests.Session) использует те же транспорты.
+    """
+    if hasattr(session, 'cache'):
+        clone = type(session)(
+            backend=session.cache,
+            expire_after=session.expire_after,
+            urls_expire_after=session.urls_expire_after,
+            allowable_codes=session.allowable_codes,
+            allowable_methods=session.allowable_methods,
+        )
+    else:
+        clone = type(session)()
+    clone.headers.update(session.headers)
+    for attr in ('stats', 'result_cache', 'retry_policy',
+                 'rate_limiter', 'parse_pool'):
+        if hasattr(session, attr):
+            setattr(clone, attr, getattr(session, attr))
+    for prefix, adapter in session.adapters.items():
+        clone.mount(prefix, adapter)
+    return clone
+
+
+def iter_with_session(session, func, items, workers=1):
+    """Вызывает func(session, item) для каждого элемента и отдаёт
+    результаты по мере готовности в исходном порядке элементов."""
+    from tqdm import tqdm
+
+    if workers <= 1:
+        for item in tqdm(items):
+            yield func(session, item)
+        return
+
+    local = threading.local()
+
+    def call(item):
+        if not hasattr(local, 'session'):
+            local.session = clone_session(session)
+        return func(local.session, item)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from tqdm(executor.map(call, items), total=len(items))
+
+
+def map_with_session(session, func, items, workers=1):
+    """Вызывает func(session, item) для каждого элемента и возвращает
+    результаты в исходном порядке элементов."""
+    return list(iter_with_session(session, func, items, workers))
@@ -0,0 +1,120 @@
+import time
+from argparse import Namespace
+
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+try:
+    from src import async_utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `async_utils.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `async_utils.py`'
+from throttling import HostRateLimiter, RetryPolicy
+
+
+class FakeResponse:
+    def __init__(self, text, status=200):
+        self._text = text
+        self.status = status
+        self.headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def text(self, encoding=None):
+        return self._text
+
+
+class FakeClient:
+    """Подменяет клиент aiohttp ответами из словаря {url: текст} или
+    {url: список пар (текст, код ответа)} для последовательных запросов."""
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def get(self, url):
+        if url not in self.pages:
+            raise aiohttp.ClientConnectionError(url)
+        self.requests.append(url)
+        page = self.pages[url]
+        if isinstance(page, list):
+            return FakeResponse(*page.pop(0))
+        return FakeResponse(page)
+
+
+def fake_client_factory(pages):
+    client = FakeClient(pages)
+    return lambda concurrency: client
+
+
+async def title(client, url):
+    soup = await async_utils.get_soup_async(client, url)
+    return soup.h1.text
+
+
+def test_map_async_local_server():
+    async def handler(request):
+        number = request.match_info['number']
+        return web.Response(text=f'<h1>Page {number}</h1>',
+                            content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/page/{number}', handler)
+
+    async def run():
+        async with TestServer(app) as server:
+            urls = [str(server.make_url(f'/page/{n}')) for n in range(10)]
+            return await async_utils.gather_with_limit(
+                title, urls, 3, async_utils.create_client
+            )
+
+    got = async_utils.asyncio.run(run())
+    assert got == [f'Page {n}' for n in range(10)], (
+        'Результаты асинхронной загрузки должны идти в порядке ссылок'
+    )
+
+
+def test_get_response_text_connection_error():
+    client_factory = fake_client_factory({})
+
+    async def fetch(client, url):
+        return await async_utils.get_response_text(client, url)
+
+    with pytest.raises(BaseException) as excinfo:
+        async_utils.map_async(fetch, ['https://example.org/'], 1,
+                              client_factory)
+    assert excinfo.typename == 'ParserConnectionFailedException'
+
+
+def test_map_async_uses_session_retries_and_rate_limit():
+    url = 'https://example.org/'
+    pages = {url: [('Busy', 503), ('<h1>Page</h1>', 200)]}
+    pages.update({f'{url}{n}': f'<h1>Page {n}</h1>' for n in range(3)})
+    client_factory = fake_client_factory(pages)
+    session = Namespace(retry_policy=RetryPolicy(retries=1, backoff=0),
+                        rate_limiter=HostRateLimiter(20, burst=1))
+
+    started = time.perf_counter()
+    got = async_utils.map_async(title, [url] + [f'{url}{n}' for n in range(3)],
+                                4, client_factory, session=session)
+    elapsed = time.perf_counter() - started
+    assert got == ['Page', 'Page 0', 'Page 1', 'Page 2'], (
+        'Запрос с временной ошибкой сервера должен повторяться'
+    )
+    assert client_factory(1).requests.count(url) == 2
+    assert elapsed >= 0.2, (
+        'Запросы к хосту должны ограничиваться --rate-limit сессии'
+    )
@@ -0,0 +1,46 @@
+import requests
+import requests_mock
+
+try:
+    from src import bench
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `bench.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `bench.py`'
+from test_main import mock_pep_pages
+
+import snapshots
+
+
+def make_corpus(path):
+    writer = snapshots.SnapshotWriter(path)
+    session = requests.Session()
+    session.hooks['response'].append(writer.add)
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        session.get('https://peps.python.org/')
+        for number in range(1, 5):
+            session.get(f'https://peps.python.org/pep-000{number}/')
+    writer.close(['pep'])
+
+
+def test_bench_pep_from_corpus(tmp_path):
+    make_corpus(tmp_path / 'corpus.zip')
+    report = bench.run(tmp_path / 'corpus.zip', modes=['pep'])
+    metrics = report['pep']
+    assert metrics['pages'] == 5, (
+        'Все страницы режима должны отдаваться из записанного корпуса'
+    )
+    for key in ('wall_time', 'pages_per_sec', 'io_time', 'parse_time',
+                'output_time', 'peak_rss_mb'):
+        assert key in metrics
+    assert 0 < metrics['parse_time'] < metrics['wall_time']
+    assert metrics['peak_rss_mb'] > 0
+
+
+def test_bench_compare_with_baseline():
+    report = {'pep': {'wall_time': 1.5}, 'whats-new': {'wall_time': 1.0}}
+    baseline = {'pep': {'wall_time': 1.0}, 'whats-new': {'wall_time': 1.0}}
+    assert bench.compare(report, baseline) == ['pep'], (
+        'Замедление больше порога должно отмечаться как регрессия'
+    )
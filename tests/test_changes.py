@@ -0,0 +1,60 @@
+import requests_mock
+
+try:
+    from src import changes
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `changes.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `changes.py`'
+from test_main import PEP_PAGE_HTML, mock_pep_pages
+
+import main
+
+
+def test_change_index_update(tmp_path):
+    index = changes.ChangeIndex(tmp_path / 'changes.sqlite')
+    first = index.update('pep', {'1': ['PEP 1', 'Draft'],
+                                 '2': ['PEP 2', 'Final'],
+                                 '3': ['PEP 3', 'Active']})
+    assert [change for change, *_ in first] == [changes.ADDED] * 3
+
+    second = index.update('pep', {'1': ['PEP 1', 'Accepted'],
+                                  '2': ['PEP 2', 'Final'],
+                                  '4': ['PEP 4', 'Draft']},
+                          unknown_keys={'3'})
+    assert second == [
+        (changes.CHANGED, '1', ['PEP 1', 'Draft'], ['PEP 1', 'Accepted']),
+        (changes.ADDED, '4', None, ['PEP 4', 'Draft']),
+    ], 'Ключи с неизвестным значением не должны считаться удалёнными'
+
+    third = index.update('pep', {'1': ['PEP 1', 'Accepted'],
+                                 '4': ['PEP 4', 'Draft']})
+    assert third == [
+        (changes.REMOVED, '2', ['PEP 2', 'Final'], None),
+        (changes.REMOVED, '3', ['PEP 3', 'Active'], None),
+    ]
+    assert index.update('pep', {'1': ['PEP 1', 'Accepted'],
+                                '4': ['PEP 4', 'Draft']}) == []
+
+
+def test_pep_changes(mock_session, pep_namespace, monkeypatch, tmp_path):
+    # main загружает модуль changes по имени из папки src
+    import changes as changes_module
+    monkeypatch.setattr(changes_module, 'CHANGES_INDEX_FILE',
+                        tmp_path / 'changes.sqlite')
+    pep_namespace.changes = True
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        first = main.pep(mock_session, pep_namespace)
+    assert len(first) == 5
+
+    mock_session.cache.clear()
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        mock.get('https://peps.python.org/pep-0003/',
+                 text=PEP_PAGE_HTML.format(status='Active'))
+        second = main.pep(mock_session, pep_namespace)
+    assert second == [
+        changes.CHANGES_HEADER,
+        (changes.CHANGED, '3', 'PEP 3; Draft', 'PEP 3; Active'),
+    ], 'Режим изменений должен выводить только изменившиеся PEP'
@@ -29,7 +29,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'jsonl', 'sqlite', 'parquet'),
         'Дополнительные способы вывода данных'
     ),
 ])
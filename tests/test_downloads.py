@@ -0,0 +1,132 @@
+import hashlib
+import re
+
+import pytest
+import requests_mock
+try:
+    from src import downloads
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `downloads.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `downloads.py`'
+
+ARCHIVE_URL = 'https://docs.python.org/3/archives/python-docs-pdf-a4.zip'
+ARCHIVE = bytes(range(256)) * 40
+HEADERS = {
+    'ETag': '"v1"',
+    'Content-Length': str(len(ARCHIVE)),
+    'Accept-Ranges': 'bytes',
+}
+
+
+def archive_body(request, context):
+    """Отдаёт архив целиком или диапазон байт из заголовка Range."""
+    matched = re.match(r'bytes=(\d+)-(\d*)', request.headers.get('Range', ''))
+    if not matched:
+        return ARCHIVE
+    start = int(matched.group(1))
+    end = int(matched.group(2)) if matched.group(2) else len(ARCHIVE) - 1
+    context.status_code = 206
+    return ARCHIVE[start:end + 1]
+
+
+def mock_archive(mock):
+    mock.head(ARCHIVE_URL, headers=HEADERS)
+    mock.get(ARCHIVE_URL, content=archive_body, headers={'ETag': '"v1"'})
+
+
+@pytest.mark.parametrize('connections', [1, 3])
+def test_download_file(mock_session, tmp_path, connections):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    with requests_mock.Mocker() as mock:
+        mock_archive(mock)
+        got = downloads.download_file(mock_session, ARCHIVE_URL, path,
+                                      connections)
+        ranges = [
+            request.headers.get('Range') for request in mock.request_history
+            if request.method == 'GET'
+        ]
+    assert got is True
+    assert path.read_bytes() == ARCHIVE
+    assert len(ranges) == connections
+    assert not list(tmp_path.glob('*.part*')), (
+        'После загрузки не должно оставаться частичных файлов'
+    )
+    assert ARCHIVE_URL not in mock_session.cache.urls, (
+        'Архив не должен сохраняться в кеш HTTP-ответов'
+    )
+
+
+def test_download_file_resumes_part(mock_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    downloads.save_meta(path, {'etag': '"v1"', 'segments': [[0, None]]})
+    (tmp_path / 'python-docs-pdf-a4.zip.part').write_bytes(ARCHIVE[:1000])
+    with requests_mock.Mocker() as mock:
+        mock_archive(mock)
+        downloads.download_file(mock_session, ARCHIVE_URL, path)
+        request = mock.request_history[-1]
+    assert request.headers['Range'] == 'bytes=1000-', (
+        'Загрузка должна продолжаться с конца частичного файла'
+    )
+    assert request.headers['If-Range'] == '"v1"'
+    assert path.read_bytes() == ARCHIVE
+
+
+def test_download_file_complete_part(mock_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    downloads.save_meta(path, {'etag': '"v1"', 'segments': [[0, None]]})
+    (tmp_path / 'python-docs-pdf-a4.zip.part').write_bytes(ARCHIVE)
+    with requests_mock.Mocker() as mock:
+        mock_archive(mock)
+        assert downloads.download_file(mock_session, ARCHIVE_URL, path)
+        methods = [request.method for request in mock.request_history]
+    assert methods == ['HEAD'], (
+        'Загруженная целиком часть не должна запрашиваться повторно'
+    )
+    assert path.read_bytes() == ARCHIVE
+
+
+def test_download_file_restarts_unsatisfiable_part(mock_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    downloads.save_meta(path, {'etag': '"v1"', 'segments': [[0, None]]})
+    (tmp_path / 'python-docs-pdf-a4.zip.part').write_bytes(ARCHIVE + b'x')
+
+    def body(request, context):
+        if request.headers.get('Range'):
+            context.status_code = 416
+            return b''
+        return ARCHIVE
+
+    with requests_mock.Mocker() as mock:
+        mock.head(ARCHIVE_URL, headers={'ETag': '"v1"'})
+        mock.get(ARCHIVE_URL, content=body, headers={'ETag': '"v1"'})
+        downloads.download_file(mock_session, ARCHIVE_URL, path)
+    assert path.read_bytes() == ARCHIVE, (
+        'При ответе 416 частичный файл должен загружаться заново'
+    )
+
+
+def test_download_file_skips_current(mock_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    with requests_mock.Mocker() as mock:
+        mock_archive(mock)
+        downloads.download_file(mock_session, ARCHIVE_URL, path)
+        got = downloads.download_file(mock_session, ARCHIVE_URL, path)
+        methods = [request.method for request in mock.request_history]
+    assert got is False
+    assert methods == ['HEAD', 'GET', 'HEAD'], (
+        'Актуальный архив не должен загружаться повторно'
+    )
+
+
+def test_download_file_checksum(mock_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    with requests_mock.Mocker() as mock:
+        mock_archive(mock)
+        downloads.download_file(mock_session, ARCHIVE_URL, path,
+                                sha256=hashlib.sha256(ARCHIVE).hexdigest())
+        with pytest.raises(BaseException) as excinfo:
+            downloads.download_file(mock_session, ARCHIVE_URL,
+                                    tmp_path / 'other.zip', sha256='0' * 64)
+    assert excinfo.typename == 'ParserDownloadException'
+    assert not (tmp_path / 'other.zip').exists()
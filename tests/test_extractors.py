@@ -0,0 +1,105 @@
+from argparse import Namespace
+
+import pytest
+import requests_mock
+
+try:
+    from src import extractors
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extractors.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extractors.py`'
+from src import crawler
+
+import main
+
+WHATS_NEW_INDEX_HTML = (
+    '<html><body><section id="what-s-new-in-python">'
+    '<div class="toctree-wrapper compound"><ul>'
+    '<li class="toctree-l1"><a href="3.12.html">3.12</a><ul>'
+    '<li class="toctree-l2"><a href="3.12.html#summary">Summary</a></li>'
+    '</ul></li>'
+    '<li class="toctree-l1"><a href="3.11.html">3.11</a></li>'
+    '<li class="toctree-l1"><a href="broken.html">Broken</a></li>'
+    '</ul></div></section></body></html>'
+)
+ARTICLE_HTML = (
+    '<html><body><h1>What’s New In Python {version}</h1>'
+    '<dl class="field-list"><dt>Editor</dt>\n<dd>{editor}</dd></dl>'
+    '</body></html>'
+)
+
+
+def mock_whats_new_pages(mock):
+    mock.get(extractors.WHATS_NEW.start_url, text=WHATS_NEW_INDEX_HTML)
+    for version, editor in (('3.12', 'Adam Turner'),
+                            ('3.11', 'Pablo Galindo Salgado')):
+        mock.get(f'https://docs.python.org/3/whatsnew/{version}.html',
+                 text=ARTICLE_HTML.format(version=version, editor=editor))
+    mock.get('https://docs.python.org/3/whatsnew/broken.html',
+             text='<html><body><p>Нет заголовка</p></body></html>')
+
+
+def test_select_fields():
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(ARTICLE_HTML.format(version='3.12', editor='A. B.'),
+                         features='lxml')
+    fields = extractors.SelectFields(('h1', True), ('dd', True),
+                                     ('p.missing', False))
+    assert fields(soup) == ('What’s New In Python 3.12', 'A. B.', '')
+    with pytest.raises(Exception, match='p.missing'):
+        extractors.SelectFields(('p.missing', True))(soup)
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_crawl_link_pages(mock_session, workers):
+    with requests_mock.Mocker() as mock:
+        mock_whats_new_pages(mock)
+        got = main.whats_new(mock_session, Namespace(workers=workers))
+    assert got == [
+        extractors.WHATS_NEW.header,
+        ('https://docs.python.org/3/whatsnew/3.12.html',
+         'What’s New In Python 3.12', 'Editor Adam Turner'),
+        ('https://docs.python.org/3/whatsnew/3.11.html',
+         'What’s New In Python 3.11', 'Editor Pablo Galindo Salgado'),
+    ], (
+        'Движок должен переходить только по ссылкам селектора цели и '
+        'пропускать страницы, которые не удалось разобрать'
+    )
+
+
+def test_get_links_not_found(mock_session):
+    with requests_mock.Mocker() as mock:
+        mock.get(extractors.DOWNLOAD.start_url, text='<html></html>')
+        with pytest.raises(Exception, match='pdf-a4.zip'):
+            crawler.get_links(mock_session, extractors.DOWNLOAD)
+
+
+def test_registered_extractor_mode(mock_session, monkeypatch):
+    # main загружает модуль extractors по имени из папки src
+    import extractors as extractors_module
+    extractor = extractors_module.Extractor(
+        'pep-topics', 'https://peps.python.org/topic/',
+        header=('Ссылка', 'Тема'),
+        link_selector='ul.topics a',
+        page_fields=extractors_module.SelectFields(('h1', True)),
+    )
+    monkeypatch.setitem(extractors_module.EXTRACTORS, extractor.name,
+                        extractor)
+    assert 'pep-topics' in main.get_available_modes()
+    assert 'pep-topics' not in main.MODE_TO_FUNCTION
+
+    with requests_mock.Mocker() as mock:
+        mock.get(extractor.start_url, text=(
+            '<ul class="topics"><li><a href="packaging/">Packaging</a></li>'
+            '<li><a href="typing/">Typing</a></li></ul>'
+        ))
+        for topic in ('packaging', 'typing'):
+            mock.get(f'https://peps.python.org/topic/{topic}/',
+                     text=f'<h1>{topic.title()} PEPs</h1>')
+        got = main.get_mode_function('pep-topics')(mock_session)
+    assert got == [
+        ('Ссылка', 'Тема'),
+        ('https://peps.python.org/topic/packaging/', 'Packaging PEPs'),
+        ('https://peps.python.org/topic/typing/', 'Typing PEPs'),
+    ]
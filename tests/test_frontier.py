@@ -0,0 +1,194 @@
+from argparse import Namespace
+
+import pytest
+import requests_mock
+
+try:
+    from src import frontier
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `frontier.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `frontier.py`'
+
+import main
+
+DOCS_URL = 'https://docs.python.org/3/'
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://docs.python.org/3/index.html', DOCS_URL),
+    ('http://docs.python.org/3/', DOCS_URL),
+    ('https://Docs.Python.org:443/3/#contents', DOCS_URL),
+    ('https://docs.python.org', 'https://docs.python.org/'),
+    ('https://docs.python.org:8080/3/library/?q=re#re',
+     'https://docs.python.org:8080/3/library/?q=re'),
+])
+def test_normalize_url(url, expected):
+    assert frontier.normalize_url(url) == expected
+
+
+def test_frontier_order_and_limits():
+    queue = frontier.Frontier(max_depth=2, domains=['docs.python.org'])
+    assert queue.add(DOCS_URL + 'b.html', depth=1) is not None
+    assert queue.add(DOCS_URL + 'a.html', depth=1, priority=0) is not None
+    assert queue.add('http://docs.python.org/3/b.html#x', depth=1) is None, (
+        'Нормализованный URL должен добавляться в очередь один раз'
+    )
+    assert queue.add(DOCS_URL + 'c.html', depth=3) is None
+    assert queue.add('https://peps.python.org/', depth=1) is None
+    assert len(queue) == 2
+    assert queue.pop_batch() == [(DOCS_URL + 'a.html', 1),
+                                 (DOCS_URL + 'b.html', 1)]
+    assert queue.add(DOCS_URL + 'a.html', depth=2) is None, (
+        'Просмотренная страница не должна снова попадать в очередь'
+    )
+
+
+def test_bloom_filter():
+    bloom = frontier.BloomFilter(1000, error_rate=0.01)
+    added = [f'{DOCS_URL}page-{number}.html' for number in range(1000)]
+    for url in added:
+        bloom.add(url)
+    assert all(url in bloom for url in added)
+    false_positives = sum(f'{DOCS_URL}other-{number}.html' in bloom
+                          for number in range(10000))
+    assert false_positives < 300
+    assert len(bloom.bits) < 2000, 'Размер фильтра не зависит от URL'
+
+
+@pytest.mark.parametrize('bloom_capacity', [0, 100])
+def test_frontier_save_load(tmp_path, bloom_capacity):
+    queue = frontier.Frontier(
+        max_depth=2, domains=['docs.python.org'],
+        seen=frontier.create_seen_set(bloom_capacity),
+    )
+    for name in ('a', 'b', 'c'):
+        queue.add(f'{DOCS_URL}{name}.html', depth=1)
+    url, _ = queue.pop()
+    queue.finish(url)
+    queue.pop()
+    queue.save(tmp_path / 'frontier.json')
+
+    restored = frontier.Frontier.load(tmp_path / 'frontier.json')
+    assert type(restored.seen) is type(queue.seen)
+    assert restored.add(DOCS_URL + 'a.html', depth=1) is None
+    assert restored.add(DOCS_URL + 'd.html', depth=1) is not None
+    assert restored.pop_batch() == [(DOCS_URL + 'b.html', 1),
+                                    (DOCS_URL + 'c.html', 1),
+                                    (DOCS_URL + 'd.html', 1)], (
+        'Полученные из очереди, но не обработанные страницы должны '
+        'сохраняться вместе с очередью'
+    )
+
+
+def test_crawl_follow_links(mock_session, monkeypatch):
+    # main загружает модуль extractors по имени из папки src
+    import extractors
+    extractor = extractors.Extractor(
+        'docs-pages', DOCS_URL + 'contents.html',
+        header=('Ссылка', 'Заголовок'),
+        link_selector='a.start',
+        page_fields=extractors.SelectFields(('h1', True)),
+        follow_selector='a',
+    )
+    monkeypatch.setitem(extractors.EXTRACTORS, extractor.name, extractor)
+    pages = {
+        'contents.html': '<a class="start" href="a.html">A</a>'
+                         '<a class="start" href="b.html#top">B</a>',
+        'a.html': '<h1>A</h1><a href="b.html">B</a><a href="c.html">C</a>'
+                  '<a href="https://peps.python.org/">PEP</a>',
+        'b.html': '<h1>B</h1><a href="index.html">Main</a>'
+                  '<a href="./">Main</a>',
+        'c.html': '<h1>C</h1><a href="d.html">D</a>',
+        'index.html': '<h1>Main</h1>',
+    }
+    with requests_mock.Mocker() as mock:
+        for page, text in pages.items():
+            mock.get(DOCS_URL + page, text=text)
+        got = main.get_mode_function('docs-pages')(
+            mock_session, Namespace(max_depth=2, bloom_capacity=0)
+        )
+        fetched = [request.url for request in mock.request_history]
+    assert got == [
+        ('Ссылка', 'Заголовок'),
+        (DOCS_URL + 'a.html', 'A'),
+        (DOCS_URL + 'b.html#top', 'B'),
+        (DOCS_URL + 'c.html', 'C'),
+        (DOCS_URL + 'index.html', 'Main'),
+    ], 'Загружаться и выводиться должна первая найденная ссылка на страницу'
+    assert len(fetched) == len(set(fetched)) == 5, (
+        'Каждая страница должна загружаться один раз, страницы глубже '
+        '--max-depth и других хостов не загружаются'
+    )
+
+
+def test_crawl_keeps_original_links(mock_session, monkeypatch):
+    import extractors
+    extractor = extractors.Extractor(
+        'http-pages', 'http://example.org/',
+        header=('Ссылка', 'Заголовок'),
+        link_selector='a',
+        page_fields=extractors.SelectFields(('h1', True)),
+    )
+    monkeypatch.setitem(extractors.EXTRACTORS, extractor.name, extractor)
+    with requests_mock.Mocker() as mock:
+        mock.get('http://example.org/', text=(
+            '<a href="docs/index.html">Docs</a><a href="page.html">Page</a>'
+            '<a href="https://example.org/page.html#top">Page</a>'
+        ))
+        mock.get('http://example.org/docs/index.html', text='<h1>Docs</h1>')
+        mock.get('http://example.org/page.html', text='<h1>Page</h1>')
+        got = main.get_mode_function('http-pages')(mock_session)
+    assert got == [
+        ('Ссылка', 'Заголовок'),
+        ('http://example.org/docs/index.html', 'Docs'),
+        ('http://example.org/page.html', 'Page'),
+    ]
+
+
+def test_crawl_frontier_state(mock_session, monkeypatch, tmp_path):
+    import extractors
+    extractor = extractors.Extractor(
+        'docs-pages', DOCS_URL + 'contents.html',
+        header=('Ссылка', 'Заголовок'),
+        link_selector='a.start',
+        page_fields=extractors.SelectFields(('h1', True)),
+        follow_selector='a',
+    )
+    monkeypatch.setitem(extractors.EXTRACTORS, extractor.name, extractor)
+    cli_args = Namespace(max_depth=2, frontier_state=str(tmp_path))
+    state_path = tmp_path / 'docs-pages.json'
+    pages = {
+        'contents.html': '<a class="start" href="a.html">A</a>'
+                         '<a class="start" href="b.html">B</a>',
+        'a.html': '<h1>A</h1><a href="c.html">C</a>',
+        'b.html': '<h1>B</h1>',
+        'c.html': '<h1>C</h1>',
+    }
+
+    def interrupt(request, context):
+        raise KeyboardInterrupt
+
+    with requests_mock.Mocker() as mock:
+        for page, text in pages.items():
+            mock.get(DOCS_URL + page, text=text)
+        mock.get(DOCS_URL + 'b.html', text=interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            main.get_mode_function('docs-pages')(mock_session, cli_args)
+    assert state_path.exists(), (
+        'Состояние обхода должно сохраняться при прерывании'
+    )
+
+    mock_session.cache.clear()
+    with requests_mock.Mocker() as mock:
+        for page, text in pages.items():
+            mock.get(DOCS_URL + page, text=text)
+        got = main.get_mode_function('docs-pages')(mock_session, cli_args)
+        fetched = [request.url for request in mock.request_history]
+    assert fetched == [DOCS_URL + 'b.html', DOCS_URL + 'c.html'], (
+        'Продолжение обхода должно загружать только необработанные страницы'
+    )
+    assert got == [('Ссылка', 'Заголовок'),
+                   (DOCS_URL + 'b.html', 'B'),
+                   (DOCS_URL + 'c.html', 'C')]
+    assert not state_path.exists()
@@ -0,0 +1,93 @@
+import pytest
+import requests_mock
+
+try:
+    from src import journal
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `journal.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `journal.py`'
+from test_main import mock_pep_pages
+
+import main
+
+
+def test_journal_resume(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    first = journal.Journal.open(path, 'run-1', checkpoint_size=2)
+    for number, status in (('1', 'Final'), ('2', 'Draft'), ('3', 'Final')):
+        first.add(number, status)
+    first.close()
+    with open(path, 'ab') as file:
+        file.write(b'{"item": "4", "val')
+
+    resumed = journal.Journal.open(path, 'run-1', resume=True)
+    assert resumed.completed == {'1': 'Final', '2': 'Draft', '3': 'Final'}, (
+        'Оборванная последняя запись журнала должна пропускаться'
+    )
+    assert resumed.counts == {'Final': 2, 'Draft': 1}
+    resumed.add('4', 'Active')
+    resumed.close()
+    assert journal.Journal(path, 'run-1').read()
+    assert journal.Journal.open(path, 'run-1', resume=True).completed == {
+        '1': 'Final', '2': 'Draft', '3': 'Final', '4': 'Active'
+    }
+
+    other = journal.Journal.open(path, 'run-2', resume=True)
+    assert other.completed == {}, (
+        'Журнал другого запуска не должен использоваться'
+    )
+    other.remove()
+    assert not path.exists()
+
+
+def interrupt(request, context):
+    raise KeyboardInterrupt
+
+
+def test_pep_without_journal(mock_session, pep_namespace, monkeypatch,
+                             tmp_path):
+    # main загружает модуль pep по имени из папки src
+    import pep
+    monkeypatch.setattr(pep, 'PEP_JOURNAL_FILE', tmp_path / 'journal.jsonl')
+
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        mock.get('https://peps.python.org/pep-0003/', text=interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            main.pep(mock_session, pep_namespace)
+    assert not (tmp_path / 'journal.jsonl').exists(), (
+        'Без --journal и --resume журнал не должен записываться'
+    )
+
+
+def test_pep_resume(mock_session, pep_namespace, tmp_path):
+    pep_namespace.journal = tmp_path / 'journal.jsonl'
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        expected = main.pep(mock_session, pep_namespace)
+    assert not (tmp_path / 'journal.jsonl').exists(), (
+        'Журнал завершённого запуска должен удаляться'
+    )
+
+    mock_session.cache.clear()
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        mock.get('https://peps.python.org/pep-0003/', text=interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            main.pep(mock_session, pep_namespace)
+    assert (tmp_path / 'journal.jsonl').exists()
+
+    mock_session.cache.clear()
+    pep_namespace.resume = True
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        got = main.pep(mock_session, pep_namespace)
+        fetched = [request.url for request in mock.request_history
+                   if '/pep-' in request.url]
+    assert fetched == ['https://peps.python.org/pep-0003/',
+                       'https://peps.python.org/pep-0004/'], (
+        'При продолжении запуска должны загружаться только PEP, статус '
+        'которых не был получен до прерывания'
+    )
+    assert got == expected
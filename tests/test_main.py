@@ -1,4 +1,5 @@
 import pytest
+import requests_mock
 from pathlib import Path
 try:
     from src import main
@@ -140,3 +141,193 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+PEP_INDEX_HTML = '''
+<section id="numerical-index"><table><tbody>
+<tr><td>IF</td><td>1</td><td><a href="pep-0001/">PEP 1</a></td></tr>
+<tr><td>SA</td><td>2</td><td><a href="pep-0002/">PEP 2</a></td></tr>
+<tr><td>P</td><td>3</td><td><a href="pep-0003/">PEP 3</a></td></tr>
+<tr><td>SR</td><td>4</td><td><a href="pep-0004/">PEP 4</a></td></tr>
+</tbody></table></section>
+'''
+PEP_PAGE_HTML = (
+    '<dl class="field-list"><dt>Author</dt><dd>Guido</dd>'
+    '<dt>Status</dt>\n<dd>{status}</dd></dl>'
+)
+
+
+def mock_pep_pages(mock):
+    mock.get('https://peps.python.org/', text=PEP_INDEX_HTML)
+    for number, status in ((1, 'Final'), (2, 'Accepted'),
+                           (3, 'Draft'), (4, 'Final')):
+        mock.get(f'https://peps.python.org/pep-000{number}/',
+                 text=PEP_PAGE_HTML.format(status=status))
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_pep_workers(mock_session, pep_namespace, workers):
+    pep_namespace.workers = workers
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        got = main.pep(mock_session, pep_namespace)
+    assert got == [
+        ('Статус', 'Количество'),
+        ('Unknown', 1),
+        ('Final', 1),
+        ('Accepted', 1),
+        ('Draft', 1),
+        ('Total', 4),
+    ], (
+        'Результат функции `pep` не должен зависеть от количества потоков'
+    )
+
+
+def test_pep_async_engine(mock_session, pep_namespace, monkeypatch):
+    import async_utils
+    from test_async_utils import fake_client_factory
+
+    pages = {
+        f'https://peps.python.org/pep-000{number}/':
+            PEP_PAGE_HTML.format(status=status)
+        for number, status in ((1, 'Final'), (2, 'Accepted'),
+                               (3, 'Draft'), (4, 'Final'))
+    }
+    monkeypatch.setattr(async_utils, 'create_client',
+                        fake_client_factory(pages))
+    pep_namespace.workers = 2
+    pep_namespace.engine = 'async'
+    with requests_mock.Mocker() as mock:
+        mock.get('https://peps.python.org/', text=PEP_INDEX_HTML)
+        got = main.pep(mock_session, pep_namespace)
+    assert ('Total', 4) in got and ('Unknown', 1) in got, (
+        'Асинхронный движок должен давать тот же результат, что и синхронный'
+    )
+
+
+def test_pep_bulk_falls_back_to_pages(mock_session, pep_namespace):
+    pep_namespace.bulk = True
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        mock.get('https://peps.python.org/api/peps.json', json={
+            '1': {'status': 'Final'},
+            '2': {'status': 'Accepted'},
+            '3': {'status': 'Draft'},
+        })
+        got = main.pep(mock_session, pep_namespace)
+        fetched_pages = [
+            request.url for request in mock.request_history
+            if '/pep-' in request.url
+        ]
+    assert fetched_pages == ['https://peps.python.org/pep-0004/'], (
+        'В режиме bulk со страниц должны загружаться только PEP, '
+        'отсутствующие в JSON API'
+    )
+    assert ('Total', 4) in got and ('Unknown', 1) in got
+
+
+def test_whats_new_page_strainer(mock_session):
+    # main загружает модуль extractors по имени из папки src
+    from extractors import WHATS_NEW
+    page = (
+        '<html><body><div class="sphinxsidebar"><ul><li>Menu</li></ul></div>'
+        '<div class="body"><section id="what-s-new-in-python-3-11">'
+        '<h1>What’s New In Python 3.11</h1>'
+        '<dl class="field-list simple"><dt>Editor</dt>\n'
+        '<dd><p>Pablo Galindo Salgado</p></dd></dl>'
+        '<p>Long article text</p></section></div></body></html>'
+    )
+    link = 'https://docs.python.org/3/whatsnew/3.11.html'
+    with requests_mock.Mocker() as mock:
+        mock.get(link, text=page)
+        soup = main.get_soup(mock_session, link, WHATS_NEW.page_strainer)
+    assert soup.find('p', string='Long article text') is None, (
+        'Дерево страницы должно строиться только для нужных тегов'
+    )
+    assert WHATS_NEW.page_fields(soup) == (
+        'What’s New In Python 3.11', 'Editor Pablo Galindo Salgado'
+    )
+
+
+def test_pep_incremental(mock_session, pep_namespace, monkeypatch, tmp_path):
+    import pep
+    monkeypatch.setattr(pep, 'PEP_SNAPSHOT_FILE', tmp_path / 'snapshot.json')
+    pep_namespace.incremental = True
+
+    def fetched_pages(mock):
+        return [
+            request.url for request in mock.request_history
+            if '/pep-' in request.url
+        ]
+
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        first = main.pep(mock_session, pep_namespace)
+        assert len(fetched_pages(mock)) == 4
+
+    changed_index = PEP_INDEX_HTML.replace('<td>P</td><td>3</td>',
+                                           '<td>PF</td><td>3</td>')
+    mock_session.cache.clear()
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        mock.get('https://peps.python.org/', text=changed_index)
+        mock.get('https://peps.python.org/pep-0003/',
+                 text=PEP_PAGE_HTML.format(status='Final'))
+        second = main.pep(mock_session, pep_namespace)
+        assert fetched_pages(mock) == [
+            'https://peps.python.org/pep-0003/',
+            'https://peps.python.org/pep-0004/',
+        ], (
+            'В режиме incremental должны загружаться только новые, '
+            'изменившиеся и не получившие статус PEP'
+        )
+    assert ('Draft', 1) in first
+    assert ('Final', 2) in second and ('Unknown', 1) in second
+
+
+def test_run_modes_outputs_each_mode(mock_session, pep_namespace,
+                                     monkeypatch, tmp_path):
+    import outputs
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    pep_namespace.mode = ['pep', 'whats-new', 'pep']
+
+    whats_new_index = (
+        '<section id="what-s-new-in-python"><div class="toctree-wrapper">'
+        '<ul><li class="toctree-l1"><a href="3.11.html">3.11</a></li></ul>'
+        '</div></section>'
+    )
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        mock.get('https://docs.python.org/3/whatsnew/', text=whats_new_index)
+        mock.get('https://docs.python.org/3/whatsnew/3.11.html',
+                 text='<h1>What’s New In Python 3.11</h1>')
+        main.run_modes(mock_session, pep_namespace)
+
+    output_files = sorted(
+        file.name.split('_')[0]
+        for file in (tmp_path / 'results').glob('*.csv')
+    )
+    assert output_files == ['pep', 'whats-new'], (
+        'Каждый выбранный режим должен сохранять свой файл с результатами'
+    )
+
+
+def test_pep_parse_workers(mock_session, pep_namespace):
+    import sessions
+    pep_namespace.workers = 4
+    with sessions.create_parse_pool(2) as parse_pool:
+        mock_session.parse_pool = parse_pool
+        with requests_mock.Mocker() as mock:
+            mock_pep_pages(mock)
+            got = main.pep(mock_session, pep_namespace)
+    assert got == [
+        ('Статус', 'Количество'),
+        ('Unknown', 1),
+        ('Final', 1),
+        ('Accepted', 1),
+        ('Draft', 1),
+        ('Total', 4),
+    ], (
+        'Результат функции `pep` не должен зависеть от разбора страниц '
+        'в отдельных процессах'
+    )
@@ -0,0 +1,45 @@
+import json
+
+import requests_mock
+try:
+    from src import metrics, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+
+PAGE_URL = 'https://peps.python.org/pep-0008/'
+
+
+def test_metrics_stages(mock_session):
+    collector = utils.metrics
+    collector.reset()
+    with requests_mock.Mocker() as mock:
+        mock.get(PAGE_URL, text='<h1>PEP 8</h1>')
+        utils.get_record(mock_session, PAGE_URL, lambda soup: soup.h1.text)
+        utils.get_record(mock_session, PAGE_URL, lambda soup: soup.h1.text)
+
+    stages = collector.as_dict()['urls'][PAGE_URL]
+    assert set(stages) == {'network', 'cache', 'parse', 'select'}, (
+        'Для страницы должно учитываться время всех этапов обработки'
+    )
+    assert collector.counters['cache_hits'] == 1
+    assert collector.counters['cache_misses'] == 1
+    assert collector.counters['bytes_transferred'] == len('<h1>PEP 8</h1>')
+
+
+def test_metrics_dump(tmp_path):
+    collector = metrics.Metrics()
+    collector.add_time('parse', PAGE_URL, 0.5)
+    collector.count_error(ValueError('boom'))
+
+    collector.dump(tmp_path / 'metrics.json')
+    dumped = json.loads((tmp_path / 'metrics.json').read_text())
+    assert dumped['errors'] == {'ValueError': 1}
+
+    collector.dump(tmp_path / 'metrics.prom')
+    prometheus = (tmp_path / 'metrics.prom').read_text()
+    assert 'pep_parser_stage_seconds_total{stage="parse"} 0.500000' in (
+        prometheus
+    )
+    assert 'pep_parser_errors_total{exception="ValueError"} 1' in prometheus
@@ -90,3 +90,85 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+@pytest.mark.parametrize('output_format', [None, 'file'])
+def test_control_output_streams_rows(monkeypatch, tmp_path, capsys,
+                                     output_format):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    written = []
+
+    def rows():
+        yield 'Статус', 'Количество'
+        for number in range(3):
+            if output_format is None:
+                written.append(capsys.readouterr().out)
+            else:
+                written.append(
+                    next((tmp_path / 'results').glob('*.csv')).read_text()
+                )
+            yield f'Статус {number}', number
+
+    outputs.control_output(rows(), cli_args('pep', output_format))
+    assert 'Статус 1' in written[-1], (
+        'Строки результата должны выводиться по мере их получения'
+    )
+
+
+def test_control_output_jsonl(monkeypatch, tmp_path, records):
+    import json
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    records = records('pep')
+    outputs.control_output(records, cli_args('pep', 'jsonl'))
+    output_file, = (tmp_path / 'results').glob('pep_*.jsonl')
+    lines = output_file.read_text(encoding='UTF-8').splitlines()
+    assert len(lines) == len(records) - 1
+    assert json.loads(lines[0]) == dict(zip(records[0], records[1])), (
+        'Строки JSON Lines должны использовать заголовки результата как ключи'
+    )
+
+
+def test_control_output_sqlite(monkeypatch, tmp_path, records):
+    import sqlite3
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    records = records('whats-new')
+    for _ in range(2):
+        outputs.control_output(records, cli_args('whats-new', 'sqlite'))
+    connection = sqlite3.connect(tmp_path / 'results' / 'results.sqlite')
+    count, = connection.execute('SELECT COUNT(*) FROM whats_new').fetchone()
+    connection.close()
+    assert count == 2 * (len(records) - 1), (
+        'Результаты каждого запуска должны добавляться в таблицу режима'
+    )
+
+
+def test_control_output_sqlite_changes(monkeypatch, tmp_path, records):
+    import sqlite3
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    outputs.control_output(records('pep'), cli_args('pep', 'sqlite'))
+    changes_args = cli_args('pep', 'sqlite')
+    changes_args.changes = True
+    outputs.control_output(
+        [('Изменение', 'Ключ', 'Было', 'Стало'),
+         ('Изменено', '3', 'PEP 3; Draft', 'PEP 3; Active')],
+        changes_args
+    )
+    connection = sqlite3.connect(tmp_path / 'results' / 'results.sqlite')
+    count, = connection.execute(
+        'SELECT COUNT(*) FROM pep_changes'
+    ).fetchone()
+    connection.close()
+    assert count == 1, (
+        'Изменения должны сохраняться в отдельную таблицу режима'
+    )
+
+
+def test_control_output_parquet(monkeypatch, tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    rows = [('Статус', 'Количество')] + [(f'S{n}', n) for n in range(5)]
+    outputs.control_output(rows, cli_args('pep', 'parquet'))
+    output_file, = (tmp_path / 'results').glob('pep_*.parquet')
+    table = pyarrow.parquet.read_table(output_file)
+    assert table.num_rows == 5
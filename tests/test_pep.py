@@ -0,0 +1,74 @@
+import pytest
+
+try:
+    from src import pep
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `pep.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `pep.py`'
+
+ROWS = (
+    ('IF', '1', 'PEP 1', 'https://peps.python.org/pep-0001/'),
+    ('SA', '2', 'PEP 2', 'https://peps.python.org/pep-0002/'),
+    ('P', '3', 'PEP 3', 'https://peps.python.org/pep-0003/'),
+    ('SR', '4', 'PEP 4', 'https://peps.python.org/pep-0004/'),
+)
+
+
+@pytest.fixture
+def peps():
+    collection = pep.PEPCollection.from_rows(ROWS)
+    collection.set_statuses(['Final', 'Accepted', 'Draft', 'Final'])
+    return collection
+
+
+def test_pep_collection_records(peps):
+    assert len(peps) == 4
+    pep_item = peps[1]
+    assert (pep_item.number, pep_item.type_key, pep_item.status_key,
+            pep_item.link, pep_item.status) == (
+        2, 'S', 'A', 'https://peps.python.org/pep-0002/', 'Accepted'
+    )
+    assert not hasattr(pep_item, '__dict__'), (
+        'Записи PEP должны использовать __slots__'
+    )
+
+
+def test_pep_collection_aggregations(peps):
+    assert peps.count_by_status() == {'Final': 1, 'Accepted': 1, 'Draft': 1}
+    assert peps.count_by_type() == {
+        ('I', 'Final'): 1, ('S', 'Accepted'): 1,
+        ('P', 'Draft'): 1, ('S', 'Final'): 1,
+    }
+    assert [pep_item.number for pep_item in peps.mismatches()] == [4]
+
+
+def test_pep_collection_unknown_status(peps):
+    peps.set_statuses(['Final', 'April Fool!', '', 'Rejected'])
+    assert peps.count_by_status() == {'Final': 1, 'Rejected': 1}
+    assert peps.count_by_type()[('P', '')] == 1, (
+        'PEP без полученного статуса должны учитываться в сводке по типам'
+    )
+    assert [pep_item.status for pep_item in peps.mismatches()] == [
+        'April Fool!', ''
+    ]
+
+
+def test_pep_collection_set_status():
+    peps = pep.PEPCollection.from_rows(ROWS)
+    assert peps.set_status(2, 'Draft') == 'Draft'
+    with pytest.raises(pep.ParserDataConflictException):
+        peps.set_status(0, 'Draft')
+    assert [peps.get_status(index) for index in range(len(peps))] == [
+        'Draft', '', 'Draft', ''
+    ], 'Несовпадающий статус тоже должен записываться'
+    assert peps.get_key_rows()[1] == (
+        2, 'S', 'A', 'https://peps.python.org/pep-0002/'
+    )
+
+
+def test_pep_collection_rejects_bad_keys():
+    with pytest.raises(ValueError):
+        pep.PEPCollection.from_rows([('XA', '1', 'PEP 1', 'link')])
+    with pytest.raises(ValueError):
+        pep.PEPCollection.from_rows([('SX', '1', 'PEP 1', 'link')])
@@ -0,0 +1,48 @@
+import requests_mock
+try:
+    from src import result_cache, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `result_cache.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `result_cache.py`'
+
+PAGE_URL = 'https://peps.python.org/pep-0008/'
+
+
+def test_result_cache_fingerprint(tmp_path):
+    cache = result_cache.ResultCache(tmp_path / 'results.sqlite')
+    cache.set('status', PAGE_URL, 'v1', 'Active')
+    assert cache.get('status', PAGE_URL, 'v1') == (True, 'Active')
+    assert cache.get('status', PAGE_URL, 'v2') == (False, None), (
+        'Запись не должна возвращаться при изменившемся отпечатке ответа'
+    )
+
+
+def test_result_cache_eviction(tmp_path):
+    cache = result_cache.ResultCache(tmp_path / 'results.sqlite', max_size=20)
+    for number in range(5):
+        cache.set('status', f'{PAGE_URL}{number}', 'v1', 'Active')
+    assert cache.get('status', f'{PAGE_URL}0', 'v1') == (False, None), (
+        'При превышении размера кеша должны удаляться старые записи'
+    )
+    assert cache.get('status', f'{PAGE_URL}4', 'v1') == (True, 'Active')
+
+
+def test_get_record_skips_parsing(mock_session, tmp_path):
+    mock_session.result_cache = result_cache.ResultCache(
+        tmp_path / 'results.sqlite'
+    )
+    calls = []
+
+    def extract(soup):
+        calls.append(soup)
+        return soup.h1.text
+
+    with requests_mock.Mocker() as mock:
+        mock.get(PAGE_URL, text='<h1>PEP 8</h1>')
+        first = utils.get_record(mock_session, PAGE_URL, extract)
+        second = utils.get_record(mock_session, PAGE_URL, extract)
+    assert first == second == 'PEP 8'
+    assert len(calls) == 1, (
+        'Неизменившаяся страница не должна разбираться повторно'
+    )
@@ -0,0 +1,85 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from argparse import Namespace
+
+import pytest
+import requests
+import requests_mock
+
+try:
+    from src import server
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `server.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `server.py`'
+from test_main import mock_pep_pages
+
+
+@pytest.fixture
+def result_server():
+    store = server.ResultStore()
+    httpd = server.ResultServer(('127.0.0.1', 0), store)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def fetch(httpd, path, headers=None):
+    request = urllib.request.Request(
+        f'http://127.0.0.1:{httpd.server_port}{path}', headers=headers or {}
+    )
+    with urllib.request.urlopen(request) as response:
+        return response.status, response.headers, response.read()
+
+
+def test_server_returns_refreshed_results(result_server, mock_session):
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        server.refresh(mock_session, Namespace(), result_server.store,
+                       ['pep'])
+
+    status, headers, body = fetch(result_server, '/pep')
+    data = json.loads(body)
+    assert status == 200
+    assert data['header'] == ['Статус', 'Количество']
+    assert ['Total', 4] in data['rows']
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        fetch(result_server, '/pep', {'If-None-Match': headers['ETag']})
+    assert error.value.code == 304, (
+        'Для неизменившегося результата должен возвращаться ответ 304'
+    )
+
+    _, _, body = fetch(result_server, '/')
+    assert json.loads(body)['pep']['etag'] == headers['ETag']
+
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        server.refresh(mock_session, Namespace(), result_server.store,
+                       ['pep'])
+    with pytest.raises(urllib.error.HTTPError) as error:
+        fetch(result_server, '/pep', {'If-None-Match': headers['ETag']})
+    assert error.value.code == 304, (
+        'ETag не должен меняться при обновлении без изменений результата'
+    )
+    assert error.value.headers['Last-Modified'] == headers['Last-Modified']
+
+
+def test_server_keeps_results_on_error(result_server, mock_session):
+    result_server.store.set('pep', [('Статус', 'Количество'), ('Total', 1)])
+    with requests_mock.Mocker() as mock:
+        mock.get('https://peps.python.org/', exc=requests.ConnectionError)
+        server.refresh(mock_session, Namespace(), result_server.store,
+                       ['pep'])
+    summary = json.loads(fetch(result_server, '/')[2])
+    assert summary['pep']['error'], 'Ошибка обновления должна сохраняться'
+    assert fetch(result_server, '/pep')[0] == 200, (
+        'При ошибке обновления должен отдаваться прежний результат'
+    )
+    with pytest.raises(urllib.error.HTTPError) as error:
+        fetch(result_server, '/whats-new')
+    assert error.value.code == 404
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+import requests_mock
+try:
+    from src import sessions
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `sessions.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `sessions.py`'
+
+PAGE_URL = 'https://peps.python.org/pep-0008/'
+
+
+def test_expired_response_revalidated():
+    session = sessions.ParserCachedSession(backend='memory', expire_after=1)
+    with requests_mock.Mocker() as mock:
+        mock.get(PAGE_URL, [
+            {'text': 'PEP 8', 'headers': {'ETag': '"v1"'}},
+            {'status_code': 304},
+        ])
+        session.get(PAGE_URL)
+        # Ответ получен раньше, чем истёк срок его хранения
+        for response in session.cache.responses.values():
+            response.created_at -= timedelta(seconds=2)
+            response.revalidate(1)
+        got = session.get(PAGE_URL)
+        conditional_request = mock.request_history[-1]
+        cached = session.get(PAGE_URL)
+        server_requests = mock.call_count
+
+    assert conditional_request.headers.get('If-None-Match') == '"v1"', (
+        'Для устаревшего ответа должен отправляться условный запрос'
+    )
+    assert got.text == 'PEP 8' and got.from_cache
+    assert cached.text == 'PEP 8' and cached.from_cache
+    assert server_requests == 2, (
+        'Ответ 304 должен продлевать срок хранения сохранённого ответа'
+    )
+    assert session.stats.as_dict() == {
+        'requests': 3, 'hits': 1, 'revalidated': 1, 'downloaded': 1,
+    }
+
+
+def test_urls_expire_after_order():
+    patterns = list(sessions.get_urls_expire_after())
+    assert patterns.index('peps.python.org/pep-*') < patterns.index(
+        'peps.python.org/'
+    ), 'Шаблон страниц PEP должен проверяться раньше общего шаблона'
+
+
+def test_create_session_pool_and_timeout(monkeypatch):
+    from argparse import Namespace
+
+    import requests
+    sent = []
+    monkeypatch.setattr(sessions.HTTPAdapter, 'send',
+                        lambda self, request, **kwargs: sent.append(kwargs))
+    session = sessions.create_session(
+        Namespace(workers=32, no_result_cache=True), backend='memory'
+    )
+    adapter = session.get_adapter(PAGE_URL)
+    assert isinstance(adapter, sessions.PooledAdapter)
+    assert adapter._pool_maxsize == 32, (
+        'Размер пула соединений должен соответствовать числу потоков'
+    )
+    adapter.send(requests.Request('GET', PAGE_URL).prepare())
+    assert sent == [{'timeout': sessions.REQUEST_TIMEOUT}], (
+        'Запросы без тайм-аута должны получать тайм-аут по умолчанию'
+    )
+
+
+def test_default_session_reused(monkeypatch):
+    base_session = sessions.ParserCachedSession(backend='memory')
+    monkeypatch.setattr(sessions, '_default_session', base_session)
+    monkeypatch.setattr(sessions, '_thread_sessions',
+                        sessions.threading.local())
+    session = sessions.get_default_session()
+    assert session is sessions.get_default_session(), (
+        'Вызовы без сессии должны использовать одну сессию в потоке'
+    )
+    assert session.cache is base_session.cache
@@ -0,0 +1,61 @@
+from argparse import Namespace
+
+import requests_mock
+
+try:
+    from src import snapshots
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `snapshots.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `snapshots.py`'
+from test_main import mock_pep_pages
+
+import main
+import sessions
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / 'crawl.zip'
+    writer = snapshots.SnapshotWriter(path)
+    with requests_mock.Mocker() as mock:
+        mock.get('https://peps.python.org/', text='Index',
+                 headers={'ETag': '"v1"'})
+        mock.get('https://peps.python.org/pep-0008/', content=b'x' * 10**5)
+        session = sessions.ParserCachedSession(backend='memory')
+        session.hooks['response'].append(writer.add)
+        session.get('https://peps.python.org/')
+        session.get('https://peps.python.org/pep-0008/')
+    writer.close(['pep'])
+
+    reader = snapshots.SnapshotReader(path)
+    try:
+        assert reader.modes == ['pep']
+        page = reader.pages['https://peps.python.org/']
+        assert page['headers'] == {'ETag': '"v1"'}
+        assert reader.read(page['file']) == b'Index'
+        large_page = reader.pages['https://peps.python.org/pep-0008/']
+        assert reader.read(large_page['file']) == b'x' * 10**5
+    finally:
+        reader.close()
+    assert path.stat().st_size < 10**4, 'Страницы в снимке должны сжиматься'
+
+
+def test_pep_from_snapshot(tmp_path, pep_namespace):
+    path = tmp_path / 'crawl.zip'
+    with requests_mock.Mocker() as mock:
+        mock_pep_pages(mock)
+        online = main.pep(
+            sessions.create_session(Namespace(no_result_cache=True),
+                                    backend='memory')
+        )
+        pages = snapshots.record(path, ['pep'])
+    assert pages == 5
+
+    pep_namespace.from_snapshot = path
+    pep_namespace.no_result_cache = True
+    session = sessions.create_session(pep_namespace)
+    adapter = session.get_adapter('https://peps.python.org/')
+    assert type(adapter).__name__ == 'SnapshotAdapter'
+    assert main.pep(session, pep_namespace) == online, (
+        'Запуск по снимку должен давать тот же результат без обращения к сети'
+    )
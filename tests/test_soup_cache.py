@@ -0,0 +1,73 @@
+try:
+    from src import soup_cache
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `soup_cache.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `soup_cache.py`'
+
+PAGE_URL = 'https://peps.python.org/pep-0008/'
+
+
+def counting_parser(calls):
+    def parse(text):
+        calls.append(text)
+        return object()
+    return parse
+
+
+def test_soup_cache_reuses_tree():
+    cache = soup_cache.SoupCache(max_size=10**6)
+    calls = []
+    first = cache.get_or_parse(PAGE_URL, 'v1', None, 'text',
+                               counting_parser(calls))
+    second = cache.get_or_parse(PAGE_URL, 'v1', None, 'text',
+                                counting_parser(calls))
+    changed = cache.get_or_parse(PAGE_URL, 'v2', None, 'text',
+                                 counting_parser(calls))
+    assert first is second, 'Повторный разбор страницы не должен выполняться'
+    assert changed is not first, (
+        'Изменившаяся страница должна разбираться заново'
+    )
+    assert len(calls) == 2
+
+
+def test_soup_cache_evicts_least_recently_used():
+    text = 'x' * 10
+    cache = soup_cache.SoupCache(
+        max_size=2 * len(text) * soup_cache.SOUP_SIZE_FACTOR
+    )
+    calls = []
+    parse = counting_parser(calls)
+    for url in ('a', 'b', 'a', 'c'):
+        cache.get_or_parse(url, 'v1', None, text, parse)
+    assert len(cache) == 2
+    cache.get_or_parse('a', 'v1', None, text, parse)
+    assert len(calls) == 3, (
+        'Из кеша должна удаляться давно не использованная страница'
+    )
+
+
+def test_soup_cache_disabled():
+    cache = soup_cache.SoupCache(max_size=0)
+    calls = []
+    for _ in range(2):
+        cache.get_or_parse(PAGE_URL, 'v1', None, 'text',
+                           counting_parser(calls))
+    assert len(calls) == 2 and len(cache) == 0
+
+
+def test_disabled_soup_cache_skips_fingerprint(monkeypatch):
+    # utils загружает модуль soup_cache по имени из папки src
+    import utils
+    from requests import Response
+
+    def fingerprint(response):
+        raise AssertionError('Отпечаток не нужен при отключённом кеше')
+
+    monkeypatch.setattr(utils.soup_cache, 'max_size', 0)
+    monkeypatch.setattr(utils, 'get_fingerprint', fingerprint)
+    response = Response()
+    response.url = PAGE_URL
+    response._content = b'<h1>PEP 8</h1>'
+    response.encoding = 'utf-8'
+    assert utils.make_soup(response).h1.text == 'PEP 8'
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve(strict=True).parent.parent / 'src'
+
+# Время импорта main с запасом для медленных машин, мкс
+IMPORT_TIME_BUDGET = 150_000
+HEAVY_MODULES = ('aiohttp', 'bs4', 'lxml', 'prettytable', 'pyarrow',
+                 'requests', 'requests_cache', 'tqdm')
+
+
+def get_import_times(module):
+    """Возвращает {модуль: суммарное время импорта, мкс} по выводу
+    python -X importtime."""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize('module', ['main', 'configs'])
+def test_startup_skips_heavy_modules(module):
+    imported = get_import_times(module)
+    heavy = [name for name in imported if name.split('.')[0] in HEAVY_MODULES]
+    assert not heavy, (
+        f'Импорт {module} не должен загружать тяжёлые зависимости: {heavy}'
+    )
+
+
+def test_startup_import_time_budget():
+    import_time = get_import_times('main')['main']
+    assert import_time < IMPORT_TIME_BUDGET, (
+        f'Импорт main занимает {import_time} мкс при бюджете '
+        f'{IMPORT_TIME_BUDGET} мкс'
+    )
+
+
+def test_import_does_not_configure_logging():
+    process = subprocess.run(
+        [sys.executable, '-c',
+         'import logging, main; '
+         'print(len(logging.getLogger("main").handlers))'],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    assert process.stdout.strip() == '0', (
+        'Логирование должно настраиваться в main(), а не при импорте'
+    )
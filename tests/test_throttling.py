@@ -0,0 +1,58 @@
+import pytest
+import requests
+import requests_mock
+
+try:
+    from src import throttling, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `throttling.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `throttling.py`'
+
+from exceptions import ParserConnectionFailedException
+
+PAGE_URL = 'https://peps.python.org/pep-0008/'
+
+
+def test_get_response_retries_transient_errors(mock_session, monkeypatch):
+    delays = []
+    monkeypatch.setattr(utils.time, 'sleep', delays.append)
+    mock_session.retry_policy = throttling.RetryPolicy(retries=3, backoff=1)
+    with requests_mock.Mocker() as mock:
+        mock.get(PAGE_URL, [
+            {'exc': requests.ConnectionError},
+            {'status_code': 503, 'headers': {'Retry-After': '7'}},
+            {'text': 'PEP 8', 'status_code': 200},
+        ])
+        got = utils.get_response(mock_session, PAGE_URL)
+    assert got.text == 'PEP 8'
+    assert len(delays) == 2 and 0 <= delays[0] <= 1 and delays[1] == 7, (
+        'Задержка перед повтором должна учитывать заголовок Retry-After'
+    )
+
+
+def test_get_response_gives_up(mock_session, monkeypatch):
+    monkeypatch.setattr(utils.time, 'sleep', lambda delay: None)
+    mock_session.retry_policy = throttling.RetryPolicy(retries=2, backoff=0)
+    with requests_mock.Mocker() as mock:
+        mock.get(PAGE_URL, exc=requests.ConnectionError)
+        with pytest.raises(ParserConnectionFailedException):
+            utils.get_response(mock_session, PAGE_URL)
+        assert mock.call_count == 3
+
+
+def test_retry_policy_backoff_is_bounded():
+    policy = throttling.RetryPolicy(retries=10, backoff=1, max_delay=5)
+    assert all(0 <= policy.get_delay(attempt) <= 5 for attempt in range(10))
+
+
+def test_token_bucket_spaces_requests():
+    now = [0.0]
+    bucket = throttling.TokenBucket(rate=2, burst=2, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0], (
+        'Запросы сверх допустимого всплеска должны ожидать маркер'
+    )
+    now[0] = 10
+    assert bucket.reserve() == 0
+    bucket.pause(3)
+    assert bucket.reserve() >= 3
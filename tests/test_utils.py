@@ -54,3 +54,39 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+def test_map_with_session_keeps_order(mock_session):
+    items = list(range(20))
+    got = utils.map_with_session(
+        mock_session, lambda session, item: item * 2, items, workers=4
+    )
+    assert got == [item * 2 for item in items], (
+        'Функция `map_with_session` должна возвращать результаты '
+        'в порядке исходных элементов'
+    )
+
+
+def test_clone_session_shares_cache(mock_session):
+    clone = utils.clone_session(mock_session)
+    assert clone is not mock_session
+    assert clone.cache is mock_session.cache, (
+        'Копия сессии должна использовать общее хранилище кеша'
+    )
+
+
+def test_clone_plain_session():
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter()
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = 'parser'
+    clone = utils.clone_session(session)
+    assert type(clone) is requests.Session
+    assert clone.get_adapter('https://peps.python.org/') is adapter, (
+        'Копия сессии без кеша должна использовать её транспорты'
+    )
+    assert clone.headers['User-Agent'] == 'parser'
+    got = utils.map_with_session(
+        session, lambda session, item: item * 2, range(8), workers=4
+    )
+    assert got == [item * 2 for item in range(8)]